@@ -0,0 +1,140 @@
+# coding=utf-8
+# author=veficos
+
+"""
+Offline benchmarks for the lexer, parser and evaluators.
+
+    python -m benchmarks run [-o results.json] [--quick]
+    python -m benchmarks compare base.json new.json [--threshold 0.10]
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+
+from expr.elexer import Lexer
+from expr.eparser import Parser
+from expr.ecompiler import compile_ast
+from expr.eoptimizer import count_nodes
+
+from .workloads import environment, workloads
+
+
+def measure(function, budget, repeat):
+    """Best per-call seconds over repeat rounds of a calibrated loop."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= budget / 10 or number >= 1 << 20:
+            break
+        number *= 2
+
+    best = elapsed / number
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def bench(name, text, env, budget, repeat):
+    tokens = len(list(Lexer(text)))
+    ast = Parser(Lexer(text)).parse()
+    nodes = count_nodes(ast)
+    function = compile_ast(ast)
+
+    lex = measure(lambda: list(Lexer(text)), budget, repeat)
+    parse = measure(lambda: Parser(Lexer(text)).parse(), budget, repeat)
+    tree = measure(lambda: ast.eval(env), budget, repeat)
+    compiled = measure(lambda: function(env), budget, repeat)
+
+    return {
+        'name': name,
+        'chars': len(text),
+        'tokens': tokens,
+        'nodes': nodes,
+        'lexer_tokens_per_sec': tokens / lex,
+        'parser_nodes_per_sec': nodes / parse,
+        'eval_ops_per_sec': 1 / tree,
+        'compiled_ops_per_sec': 1 / compiled,
+    }
+
+
+def run(args):
+    env = environment()
+    budget = 0.05 if args.quick else 0.5
+    repeat = 3 if args.quick else 5
+
+    results = []
+    for name, text in workloads():
+        result = bench(name, text, env, budget, repeat)
+        results.append(result)
+        print('%-16s lex %12.0f tok/s  parse %12.0f node/s  eval %10.0f op/s  compiled %10.0f op/s' % (
+            name, result['lexer_tokens_per_sec'], result['parser_nodes_per_sec'],
+            result['eval_ops_per_sec'], result['compiled_ops_per_sec']))
+
+    report = {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    return 0
+
+
+def compare(args):
+    with open(args.base) as f:
+        base = {x['name']: x for x in json.load(f)['results']}
+    with open(args.new) as f:
+        new = {x['name']: x for x in json.load(f)['results']}
+
+    regressions = 0
+    for name in sorted(set(base) & set(new)):
+        for metric in sorted(k for k in new[name] if k.endswith('_per_sec')):
+            if metric not in base[name]:
+                continue
+            ratio = new[name][metric] / base[name][metric]
+            flag = ''
+            if ratio < 1 - args.threshold:
+                flag = '  REGRESSION'
+                regressions += 1
+            print('%-16s %-22s %7.2fx%s' % (name, metric, ratio, flag))
+
+    print('%d regression(s) beyond %.0f%%' % (regressions, args.threshold * 100))
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    commands = parser.add_subparsers(dest='command')
+
+    run_parser = commands.add_parser('run', help='run all benchmarks')
+    run_parser.add_argument('-o', '--output', help='write results as JSON')
+    run_parser.add_argument('--quick', action='store_true', help='shorter timing budget')
+
+    compare_parser = commands.add_parser('compare', help='compare two JSON result files')
+    compare_parser.add_argument('base')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('--threshold', type=float, default=0.10,
+                                help='allowed slowdown as a fraction (default 0.10)')
+
+    args = parser.parse_args(argv)
+    if args.command == 'run':
+        return run(args)
+    elif args.command == 'compare':
+        return compare(args)
+    parser.print_help()
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,64 @@
+# coding=utf-8
+# author=veficos
+
+import random
+
+from expr import Environment
+
+
+README_SAMPLE = '"equal" if (math.add(1, 2) + 3 == 6) == (math.add(3, 9) / 4 == 3) else "not equal"'
+
+_operators = ['+', '-', '*', '>', '<', '==', '&&', '||']
+
+
+def arithmetic(length, seed=0):
+    rand = random.Random(seed)
+    terms = ['x' if rand.random() < 0.3 else str(rand.randint(1, 99)) for _ in range(length)]
+    text = terms[0]
+    for term in terms[1:]:
+        text += ' %s %s' % (rand.choice(_operators), term)
+    return text
+
+
+def nested(depth):
+    text = 'x'
+    for i in range(depth):
+        text = '(%s + %d)' % (text, i + 1)
+    return text
+
+
+def chain(length):
+    text = 'data'
+    for i in range(length):
+        text += '.next' if i % 2 == 0 else '[0]'
+    return text + '.value'
+
+
+def function_heavy(count):
+    args = ', '.join('math.add(x, %d)' % i for i in range(count))
+    return 'sum(%s) > 10 && math.add(x, 1) > 0' % args
+
+
+def environment(chain_length=64):
+    env = Environment()
+    env.push_object('x', 7)
+    env.push_object('math', {'add': lambda x, y: x + y})
+    env.push_object('sum', lambda *args: sum(args))
+
+    data = {'value': 42}
+    for i in reversed(range(chain_length)):
+        data = {'next': data} if i % 2 == 0 else [data]
+    env.push_object('data', data)
+    return env
+
+
+def workloads():
+    yield 'readme', README_SAMPLE
+    for length in (10, 100, 1000):
+        yield 'arithmetic-%d' % length, arithmetic(length, seed=length)
+    for depth in (10, 40, 80):
+        yield 'nested-%d' % depth, nested(depth)
+    for length in (4, 16, 64):
+        yield 'chain-%d' % length, chain(length)
+    for count in (2, 8, 32):
+        yield 'functions-%d' % count, function_heavy(count)
@@ -2,3 +2,24 @@
 # author=veficos
 
 from expr.executor import Environment, Executor
+from expr.ecache import ASTCache, default_cache
+from expr.ecompiler import CompileError, compile_ast
+from expr.eoptimizer import Optimizer, optimize, specialize
+from expr.evector import VectorError, VectorEvaluator, vectorize
+from expr.erules import RuleSet
+from expr.evm import Op, Program, VMError, assemble, disassemble
+from expr.eartifact import Artifact, ArtifactError, load_artifact, write_artifact
+from expr.eflat import FlatError, FlatTree, flatten, sizeof
+from expr.ereactive import Reactive
+from expr.epool import EvaluationError, evaluate_many
+from expr.easync import aeval, compile_async
+from expr.epure import PureFunction, pure
+from expr.eprofile import NodeStats, Profiler
+from expr.epipeline import Pipeline, read_csv, read_jsonl, write_csv, write_jsonl
+from expr.edepend import Dependencies, dependencies, eager_roots, format_path, project
+from expr.elazy import LazyDict, LazyEnvironment
+from expr.eadaptive import AdaptiveChain, AdaptiveExpression, adapt
+from expr.eindex import RuleIndex
+from expr.escope import Scope, ScopeError
+from expr.enumeric import DecimalMode, FloatMode, NumericMode, ScaledMode
+from expr.ebulk import RuleError, compile_rules, load_rules, read_rules
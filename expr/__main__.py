@@ -0,0 +1,94 @@
+# coding=utf-8
+# author=veficos
+
+"""
+Command line tools. They live here rather than in the modules they drive,
+because those modules are imported by the package and running them with
+-m would load them twice.
+
+    python -m expr pipeline [INPUT] [-f jsonl|csv] [-c NAME=EXPR] [-w EXPR]
+    python -m expr artifact OUTPUT RULES...
+    python -m expr bulk RULES [-j WORKERS]
+"""
+
+import argparse
+import sys
+
+from .epipeline import Pipeline, read_csv, read_jsonl, write_csv, write_jsonl
+from .eartifact import write_artifact
+from .ebulk import load_rules
+
+
+def pipeline(args, parser):
+    columns = []
+    for column in args.column:
+        name, sep, text = column.partition('=')
+        if not sep or not name.strip():
+            parser.error('column must look like NAME=EXPR: %s' % column)
+        columns.append((name.strip(), text))
+
+    stream = open(args.input, encoding='utf-8', newline='') if args.input else sys.stdin
+    try:
+        records = read_csv(stream, args.raw) if args.format == 'csv' else read_jsonl(stream)
+        runner = Pipeline(columns, args.where)
+        writer = write_csv if (args.to or args.format) == 'csv' else write_jsonl
+        writer(runner.run(records), sys.stdout)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    print('records: %d, matched: %d, errors: %d' % (runner.records, runner.matched, runner.errors),
+          file=sys.stderr)
+    return 0
+
+
+def artifact(args, parser):
+    texts = []
+    for name in args.rules:
+        with open(name, encoding='utf-8') as f:
+            texts.extend(x.strip() for x in f if x.strip())
+    write_artifact(args.output, texts)
+    return 0
+
+
+def bulk(args, parser):
+    functions, errors = load_rules(args.input, args.workers)
+    for error in errors:
+        print('%s:%d:%d: %s: %s' % (args.input, error.line, error.column, error.name, error.message))
+    print('compiled: %d, errors: %d' % (len(functions), len(errors)), file=sys.stderr)
+    return 1 if errors else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m expr')
+    commands = parser.add_subparsers(dest='command')
+
+    pipeline_parser = commands.add_parser('pipeline',
+                                          help='evaluate expressions against each record of a JSONL or CSV stream')
+    pipeline_parser.add_argument('input', nargs='?', help='input file (default stdin)')
+    pipeline_parser.add_argument('-f', '--format', choices=['jsonl', 'csv'], default='jsonl', help='input format')
+    pipeline_parser.add_argument('-t', '--to', choices=['jsonl', 'csv'], help='output format (default: input format)')
+    pipeline_parser.add_argument('-c', '--column', action='append', default=[], metavar='NAME=EXPR',
+                                 help='add a column holding the value of EXPR')
+    pipeline_parser.add_argument('-w', '--where', action='append', default=[], metavar='EXPR',
+                                 help='keep only records for which EXPR is true')
+    pipeline_parser.add_argument('--raw', action='store_true', help='keep CSV cells as strings')
+
+    artifact_parser = commands.add_parser('artifact', help='precompile rule files into a binary artifact')
+    artifact_parser.add_argument('output')
+    artifact_parser.add_argument('rules', nargs='+', help='files with one expression per line')
+
+    bulk_parser = commands.add_parser('bulk', help='compile a rule file and report every rule that fails')
+    bulk_parser.add_argument('input', help='rule file, one expression per line or a JSON object')
+    bulk_parser.add_argument('-j', '--workers', type=int, help='parser processes (default: cpu count)')
+
+    args = parser.parse_args(argv)
+    command = {'pipeline': pipeline, 'artifact': artifact, 'bulk': bulk}.get(args.command, None)
+    if command is None:
+        parser.print_help()
+        return 2
+    return command(args, commands.choices[args.command])
+
+
+if __name__ == '__main__':
+    sys.exit(main())
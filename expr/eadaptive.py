@@ -0,0 +1,198 @@
+# coding=utf-8
+# author=veficos
+
+import time
+
+from .east import *
+from .epure import PureFunction
+from .eoptimizer import _is_path, _is_predicate
+
+
+def _calls(node):
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if type(node) is FunctionCall:
+            yield node
+        # nested chains are built before the chain holding them
+        stack.extend(node.operands if type(node) is AdaptiveChain else children(node))
+
+
+class AdaptiveChain(object):
+    """
+    A run of && or || such as a && b && c. Once every operand is known to be
+    side-effect free, operands are sampled for cost and truth rate and
+    evaluated cheapest-most-decisive first. The returned value is always the
+    one source order would give, and any error under the adaptive order
+    re-runs the chain in source order.
+
+    An operand left of the deciding one may be skipped only when it yields
+    a bool: statically for comparisons, or when every sample of it so far
+    returned a bool. Purity is checked on every evaluation, since the same
+    name may be bound to a different function in another environment.
+    """
+
+    def __init__(self, kind, operands, warmup=64, sample_every=32, clock=time.perf_counter):
+        self.kind = kind
+        self.operands = operands
+        self.warmup = warmup
+        self.sample_every = sample_every
+        self.clock = clock
+
+        self.order = list(range(len(operands)))
+        self.predicates = [_is_predicate(x) for x in operands]
+        self.calls = [x for operand in operands for x in _calls(operand)]
+        self.safe = None
+        self.evaluations = 0
+        self.samples = 0
+        self.fallbacks = 0
+        self.costs = [0.0] * len(operands)
+        self.truths = [0] * len(operands)
+        self.bools = [0] * len(operands)
+
+    def __check(self, env):
+        for call in self.calls:
+            if not _is_path(call.function):
+                return False
+            try:
+                if type(call.function.eval(env)) is not PureFunction:
+                    return False
+            except Exception:
+                return False
+        return True
+
+    def __ordered(self, env, order):
+        decisive = self.kind is LogicalOr
+        values = {}
+        for i in order:
+            value = values[i] = self.operands[i].eval(env)
+            if bool(value) == decisive:
+                return self.__resolve(env, values, i)
+        return values[len(self.operands) - 1]
+
+    def __resolve(self, env, values, k):
+        # the source order result is the first decisive operand left of k, if any;
+        # an unevaluated bool-valued operand could only contribute the same bool
+        decisive = self.kind is LogicalOr
+        exact = type(values[k]) is bool
+        for j in range(k):
+            if j not in values:
+                if exact and (self.predicates[j] or self.bools[j] == self.samples > 0):
+                    continue
+                values[j] = self.operands[j].eval(env)
+            if bool(values[j]) == decisive:
+                return values[j]
+        return values[k]
+
+    def __sample(self, env):
+        values = []
+        costs = []
+        clock = self.clock
+        for operand in self.operands:
+            start = clock()
+            values.append(operand.eval(env))
+            costs.append(clock() - start)
+
+        self.samples += 1
+        for i, (value, cost) in enumerate(zip(values, costs)):
+            self.costs[i] += cost
+            self.truths[i] += 1 if value else 0
+            self.bools[i] += 1 if type(value) is bool else 0
+        self.__reorder()
+
+        decisive = self.kind is LogicalOr
+        for value in values:
+            if bool(value) == decisive:
+                return value
+        return values[-1]
+
+    def __reorder(self):
+        decisive = self.kind is LogicalOr
+
+        def rank(i):
+            cost = self.costs[i] / self.samples
+            rate = self.truths[i] / float(self.samples)
+            if not decisive:
+                rate = 1.0 - rate
+            return cost / max(rate, 1e-6)
+        self.order = sorted(range(len(self.operands)), key=rank)
+
+    def eval(self, env):
+        self.evaluations += 1
+        self.safe = self.__check(env)
+        if not self.safe:
+            return self.__ordered(env, range(len(self.operands)))
+
+        try:
+            if self.evaluations <= self.warmup or self.evaluations % self.sample_every == 0:
+                return self.__sample(env)
+            return self.__ordered(env, self.order)
+        except Exception:
+            self.fallbacks += 1
+            return self.__ordered(env, range(len(self.operands)))
+
+    def stats(self):
+        samples = max(self.samples, 1)
+        return {
+            'operator': '&&' if self.kind is LogicalAnd else '||',
+            'safe': self.safe,
+            'order': list(self.order),
+            'evaluations': self.evaluations,
+            'samples': self.samples,
+            'fallbacks': self.fallbacks,
+            'operands': [{
+                'node': repr(x),
+                'cost': self.costs[i] / samples,
+                'truth_rate': self.truths[i] / float(samples),
+            } for i, x in enumerate(self.operands)],
+        }
+
+    def __repr__(self):
+        return '(AdaptiveChain: %s)' % (' %s ' % ('&&' if self.kind is LogicalAnd else '||')).join(
+            repr(self.operands[i]) for i in self.order)
+
+
+class AdaptiveExpression(object):
+    def __init__(self, ast, **kwargs):
+        self.kwargs = kwargs
+        self.chains = []
+        self.ast = self.__build(ast)
+
+    def __flatten(self, node, kind):
+        if type(node) is kind:
+            return self.__flatten(node.lhs, kind) + self.__flatten(node.rhs, kind)
+        return [node]
+
+    def __build(self, node):
+        kind = type(node)
+
+        if kind is LogicalAnd or kind is LogicalOr:
+            chain = AdaptiveChain(kind, [self.__build(x) for x in self.__flatten(node, kind)], **self.kwargs)
+            self.chains.append(chain)
+            return chain
+        elif kind is Member:
+            return Member(self.__build(node.obj), node.member)
+        elif kind is Subscript:
+            return Subscript(self.__build(node.obj), self.__build(node.subscript))
+        elif kind is FunctionCall:
+            return FunctionCall(self.__build(node.function), [self.__build(x) for x in node.args])
+        elif kind is Negative or kind is Not:
+            return kind(self.__build(node.value))
+        elif isinstance(node, Binary):
+            return kind(self.__build(node.lhs), self.__build(node.rhs))
+        elif kind is If:
+            return If(self.__build(node.yes), self.__build(node.condition), self.__build(node.no))
+        return node
+
+    def eval(self, env):
+        return self.ast.eval(env)
+
+    def stats(self):
+        return [x.stats() for x in self.chains]
+
+    def __repr__(self):
+        return '(AdaptiveExpression: %s)' % repr(self.ast)
+
+
+def adapt(ast, **kwargs):
+    return AdaptiveExpression(ast, **kwargs)
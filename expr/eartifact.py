@@ -0,0 +1,296 @@
+# coding=utf-8
+# author=veficos
+
+import decimal
+import mmap
+import struct
+import threading
+
+from .east import *
+from .elexer import Lexer
+from .eparser import Parser
+from .eoptimizer import optimize
+
+
+class ArtifactError(Exception):
+    pass
+
+
+MAGIC = b'EXPR'
+VERSION = 1
+
+FLAG_OPTIMIZED = 1
+
+_header = struct.Struct('<4sHHI')
+_entry = struct.Struct('<IIII')
+_u32 = struct.Struct('<I')
+
+
+class Tag:
+    Integer = 1
+    Decimal = 2
+    Float = 3
+    Bool = 4
+    Nil = 5
+    String = 6
+    Symbol = 7
+    Member = 8
+    Subscript = 9
+    FunctionCall = 10
+    Negative = 11
+    Not = 12
+    Multiply = 13
+    Divide = 14
+    IntegerDivide = 15
+    Add = 16
+    Subtract = 17
+    LessOrEqual = 18
+    GreaterOrEqual = 19
+    LessThan = 20
+    GreaterThan = 21
+    Equal = 22
+    UnEqual = 23
+    LogicalAnd = 24
+    LogicalOr = 25
+    If = 26
+
+
+_binary_tags = {
+    Multiply: Tag.Multiply,
+    Divide: Tag.Divide,
+    IntegerDivide: Tag.IntegerDivide,
+    Add: Tag.Add,
+    Subtract: Tag.Subtract,
+    LessOrEqual: Tag.LessOrEqual,
+    GreaterOrEqual: Tag.GreaterOrEqual,
+    LessThan: Tag.LessThan,
+    GreaterThan: Tag.GreaterThan,
+    Equal: Tag.Equal,
+    UnEqual: Tag.UnEqual,
+    LogicalAnd: Tag.LogicalAnd,
+    LogicalOr: Tag.LogicalOr,
+}
+
+_binary_nodes = {v: k for k, v in _binary_tags.items()}
+
+
+def _write_text(out, text):
+    data = text.encode('utf-8')
+    out += _u32.pack(len(data))
+    out += data
+
+
+def encode(node, out=None):
+    if out is None:
+        out = bytearray()
+    kind = type(node)
+
+    if kind is IntegerConstant:
+        out.append(Tag.Integer)
+        _write_text(out, str(node.value))
+    elif kind is DecimalConstant:
+        if isinstance(node.value, float):
+            out.append(Tag.Float)
+            _write_text(out, repr(node.value))
+        else:
+            out.append(Tag.Decimal)
+            _write_text(out, str(node.value))
+    elif kind is BoolConstant:
+        out.append(Tag.Bool)
+        out.append(1 if node.value else 0)
+    elif kind is NilConstant:
+        out.append(Tag.Nil)
+    elif kind is StringConstant:
+        out.append(Tag.String)
+        _write_text(out, node.value)
+    elif kind is Symbol:
+        out.append(Tag.Symbol)
+        _write_text(out, str(node))
+    elif kind is Member:
+        out.append(Tag.Member)
+        _write_text(out, node.member)
+        encode(node.obj, out)
+    elif kind is Subscript:
+        out.append(Tag.Subscript)
+        encode(node.obj, out)
+        encode(node.subscript, out)
+    elif kind is FunctionCall:
+        out.append(Tag.FunctionCall)
+        out += _u32.pack(len(node.args))
+        encode(node.function, out)
+        for x in node.args:
+            encode(x, out)
+    elif kind is Negative:
+        out.append(Tag.Negative)
+        encode(node.value, out)
+    elif kind is Not:
+        out.append(Tag.Not)
+        encode(node.value, out)
+    elif kind in _binary_tags:
+        out.append(_binary_tags[kind])
+        encode(node.lhs, out)
+        encode(node.rhs, out)
+    elif kind is If:
+        out.append(Tag.If)
+        encode(node.yes, out)
+        encode(node.condition, out)
+        encode(node.no, out)
+    else:
+        raise ArtifactError('unsupported node: %s' % repr(node))
+    return out
+
+
+class _Decoder(object):
+    def __init__(self, buffer, pos, end):
+        self.buffer = buffer
+        self.pos = pos
+        self.end = end
+
+    def text(self):
+        size, = _u32.unpack_from(self.buffer, self.pos)
+        start = self.pos + _u32.size
+        self.pos = start + size
+        if self.pos > self.end:
+            raise ArtifactError('truncated rule data')
+        return bytes(self.buffer[start:self.pos]).decode('utf-8')
+
+    def decode(self):
+        if self.pos >= self.end:
+            raise ArtifactError('truncated rule data')
+        tag = self.buffer[self.pos]
+        self.pos += 1
+
+        if tag == Tag.Integer:
+            return IntegerConstant(int(self.text()))
+        elif tag == Tag.Decimal:
+            return DecimalConstant(decimal.Decimal(self.text()))
+        elif tag == Tag.Float:
+            return DecimalConstant(float(self.text()))
+        elif tag == Tag.Bool:
+            self.pos += 1
+            return BoolConstant(self.buffer[self.pos - 1] != 0)
+        elif tag == Tag.Nil:
+            return NilConstant(None)
+        elif tag == Tag.String:
+            return StringConstant(self.text())
+        elif tag == Tag.Symbol:
+            return Symbol(self.text())
+        elif tag == Tag.Member:
+            member = self.text()
+            return Member(self.decode(), member)
+        elif tag == Tag.Subscript:
+            obj = self.decode()
+            return Subscript(obj, self.decode())
+        elif tag == Tag.FunctionCall:
+            count, = _u32.unpack_from(self.buffer, self.pos)
+            self.pos += _u32.size
+            function = self.decode()
+            return FunctionCall(function, [self.decode() for _ in range(count)])
+        elif tag == Tag.Negative:
+            return Negative(self.decode())
+        elif tag == Tag.Not:
+            return Not(self.decode())
+        elif tag in _binary_nodes:
+            lhs = self.decode()
+            return _binary_nodes[tag](lhs, self.decode())
+        elif tag == Tag.If:
+            yes = self.decode()
+            condition = self.decode()
+            return If(yes, condition, self.decode())
+        raise ArtifactError('unknown tag %d at offset %d' % (tag, self.pos - 1))
+
+
+def decode(buffer, pos=0, end=None):
+    decoder = _Decoder(buffer, pos, len(buffer) if end is None else end)
+    node = decoder.decode()
+    if decoder.pos != decoder.end:
+        raise ArtifactError('trailing rule data')
+    return node
+
+
+def write_artifact(path, texts, optimized=True):
+    texts = list(dict.fromkeys(texts))
+    keys = [x.encode('utf-8') for x in texts]
+    blobs = []
+    for text in texts:
+        ast = Parser(Lexer(text)).parse()
+        if optimized:
+            ast = optimize(ast)
+        blobs.append(bytes(encode(ast)))
+
+    offset = _header.size + _entry.size * len(texts)
+    entries = bytearray()
+    body = bytearray()
+    for key, blob in zip(keys, blobs):
+        entries += _entry.pack(offset + len(body), len(key), offset + len(body) + len(key), len(blob))
+        body += key
+        body += blob
+
+    with open(path, 'wb') as f:
+        f.write(_header.pack(MAGIC, VERSION, FLAG_OPTIMIZED if optimized else 0, len(texts)))
+        f.write(entries)
+        f.write(body)
+
+
+class Artifact(object):
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.loaded = {}
+
+        with open(path, 'rb') as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self.buffer) < _header.size:
+            raise ArtifactError('%s: not an expr artifact' % path)
+        magic, version, flags, count = _header.unpack_from(self.buffer, 0)
+        if magic != MAGIC:
+            raise ArtifactError('%s: not an expr artifact' % path)
+        if version != VERSION:
+            raise ArtifactError('%s: unsupported artifact version %d' % (path, version))
+
+        self.optimized = bool(flags & FLAG_OPTIMIZED)
+        self.index = {}
+        for i in range(count):
+            key_offset, key_size, data_offset, data_size = \
+                _entry.unpack_from(self.buffer, _header.size + _entry.size * i)
+            key = self.buffer[key_offset:key_offset + key_size].decode('utf-8')
+            self.index[key] = (data_offset, data_size)
+
+    def get(self, text):
+        ast = self.loaded.get(text, None)
+        if ast is not None:
+            return ast
+
+        location = self.index.get(text, None)
+        if location is None:
+            return None
+        offset, size = location
+        ast = decode(self.buffer, offset, offset + size)
+        with self.lock:
+            return self.loaded.setdefault(text, ast)
+
+    def keys(self):
+        return self.index.keys()
+
+    def close(self):
+        self.buffer.close()
+
+    def __contains__(self, text):
+        return text in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __repr__(self):
+        return '(Artifact: %s, %d rules, %d loaded)' % (self.path, len(self.index), len(self.loaded))
+
+
+def load_artifact(path):
+    return Artifact(path)
@@ -2,14 +2,21 @@
 # author=veficos
 
 import decimal
+import operator
+
+from .epure import PureFunction
 
 
 class Constant(object):
+    __slots__ = ('value',)
+
     def __init__(self, value):
         self.value = value
 
 
 class IntegerConstant(Constant):
+    __slots__ = ()
+
     def eval(self, env):
         return self.value
 
@@ -18,6 +25,8 @@ class IntegerConstant(Constant):
 
 
 class DecimalConstant(Constant):
+    __slots__ = ()
+
     def eval(self, env):
         return self.value
 
@@ -26,6 +35,8 @@ class DecimalConstant(Constant):
 
 
 class BoolConstant(Constant):
+    __slots__ = ()
+
     def __init__(self, value):
         self.value = value
 
@@ -40,6 +51,8 @@ class BoolConstant(Constant):
 
 
 class NilConstant(Constant):
+    __slots__ = ()
+
     def eval(self, env):
         return None
 
@@ -48,6 +61,8 @@ class NilConstant(Constant):
 
 
 class StringConstant(Constant):
+    __slots__ = ()
+
     def eval(self, env):
         return self.value
 
@@ -56,6 +71,8 @@ class StringConstant(Constant):
 
 
 class Symbol(str):
+    __slots__ = ()
+
     def eval(self, env):
         return env.get_object(str(self))
 
@@ -64,6 +81,8 @@ class Symbol(str):
 
 
 class Member(object):
+    __slots__ = ('obj', 'member')
+
     def __init__(self, obj, member):
         self.obj = obj
         self.member = member
@@ -83,6 +102,8 @@ class Member(object):
 
 
 class FunctionCall(object):
+    __slots__ = ('function', 'args')
+
     def __init__(self, function, args):
         self.function = function
         self.args = args
@@ -91,6 +112,8 @@ class FunctionCall(object):
         function = self.function.eval(env)
         args = [x.eval(env) for x in self.args]
 
+        if type(function) is PureFunction:
+            return function.call(env, tuple(args))
         return function(*args)
 
     def __repr__(self):
@@ -98,6 +121,8 @@ class FunctionCall(object):
 
 
 class Subscript(object):
+    __slots__ = ('obj', 'subscript')
+
     def __init__(self, obj, subscript):
         self.obj = obj
         self.subscript = subscript
@@ -119,6 +144,8 @@ class Subscript(object):
 
 
 class Negative(object):
+    __slots__ = ('value',)
+
     def __init__(self, value):
         self.value = value
 
@@ -130,6 +157,8 @@ class Negative(object):
 
 
 class Not(object):
+    __slots__ = ('value',)
+
     def __init__(self, value):
         self.value = value
 
@@ -141,12 +170,16 @@ class Not(object):
 
 
 class Binary(object):
+    __slots__ = ('lhs', 'rhs')
+
     def __init__(self, lhs, rhs):
         self.lhs = lhs
         self.rhs = rhs
 
 
 class Multiply(Binary):
+    __slots__ = ()
+
     def eval(self, env):
         return self.lhs.eval(env) * self.rhs.eval(env)
 
@@ -155,6 +188,8 @@ class Multiply(Binary):
 
 
 class Divide(Binary):
+    __slots__ = ()
+
     def eval(self, env):
         return self.lhs.eval(env) / self.rhs.eval(env)
 
@@ -163,6 +198,8 @@ class Divide(Binary):
 
 
 class IntegerDivide(Binary):
+    __slots__ = ()
+
     def eval(self, env):
         return self.lhs.eval(env) % self.rhs.eval(env)
 
@@ -171,6 +208,8 @@ class IntegerDivide(Binary):
 
 
 class Add(Binary):
+    __slots__ = ()
+
     def eval(self, env):
         return self.lhs.eval(env) + self.rhs.eval(env)
 
@@ -179,6 +218,8 @@ class Add(Binary):
 
 
 class Subtract(Binary):
+    __slots__ = ()
+
     def eval(self, env):
         return self.lhs.eval(env) - self.rhs.eval(env)
 
@@ -187,6 +228,8 @@ class Subtract(Binary):
 
 
 class LessOrEqual(Binary):
+    __slots__ = ()
+
     def eval(self, env):
         return self.lhs.eval(env) <= self.rhs.eval(env)
 
@@ -195,6 +238,8 @@ class LessOrEqual(Binary):
 
 
 class GreaterOrEqual(Binary):
+    __slots__ = ()
+
     def eval(self, env):
         return self.lhs.eval(env) >= self.rhs.eval(env)
 
@@ -203,6 +248,8 @@ class GreaterOrEqual(Binary):
 
 
 class LessThan(Binary):
+    __slots__ = ()
+
     def eval(self, env):
         return self.lhs.eval(env) < self.rhs.eval(env)
 
@@ -211,6 +258,8 @@ class LessThan(Binary):
 
 
 class GreaterThan(Binary):
+    __slots__ = ()
+
     def eval(self, env):
         return self.lhs.eval(env) > self.rhs.eval(env)
 
@@ -219,6 +268,8 @@ class GreaterThan(Binary):
 
 
 class Equal(Binary):
+    __slots__ = ()
+
     def eval(self, env):
         return self.lhs.eval(env) == self.rhs.eval(env)
 
@@ -227,6 +278,8 @@ class Equal(Binary):
 
 
 class UnEqual(Binary):
+    __slots__ = ()
+
     def eval(self, env):
         return self.lhs.eval(env) != self.rhs.eval(env)
 
@@ -235,6 +288,8 @@ class UnEqual(Binary):
 
 
 class LogicalAnd(Binary):
+    __slots__ = ()
+
     def eval(self, env):
         return self.lhs.eval(env) and self.rhs.eval(env)
 
@@ -243,6 +298,8 @@ class LogicalAnd(Binary):
 
 
 class LogicalOr(Binary):
+    __slots__ = ()
+
     def eval(self, env):
         return self.lhs.eval(env) or self.rhs.eval(env)
 
@@ -251,6 +308,8 @@ class LogicalOr(Binary):
 
 
 class If(object):
+    __slots__ = ('yes', 'condition', 'no')
+
     def __init__(self, yes, condition, no):
         self.yes = yes
         self.condition = condition
@@ -263,4 +322,35 @@ class If(object):
         return self.no.eval(env)
 
     def __repr__(self):
-        return '(If: %s if %s else %s)' % (repr(self.yes), repr(self.condition), repr(self.no))
\ No newline at end of file
+        return '(If: %s if %s else %s)' % (repr(self.yes), repr(self.condition), repr(self.no))
+
+
+binary_operators = {
+    Multiply: operator.mul,
+    Divide: operator.truediv,
+    IntegerDivide: operator.mod,
+    Add: operator.add,
+    Subtract: operator.sub,
+    LessOrEqual: operator.le,
+    GreaterOrEqual: operator.ge,
+    LessThan: operator.lt,
+    GreaterThan: operator.gt,
+    Equal: operator.eq,
+    UnEqual: operator.ne,
+}
+
+
+def children(node):
+    if isinstance(node, Member):
+        return [node.obj]
+    elif isinstance(node, Subscript):
+        return [node.obj, node.subscript]
+    elif isinstance(node, FunctionCall):
+        return [node.function] + list(node.args)
+    elif isinstance(node, (Negative, Not)):
+        return [node.value]
+    elif isinstance(node, Binary):
+        return [node.lhs, node.rhs]
+    elif isinstance(node, If):
+        return [node.yes, node.condition, node.no]
+    return []
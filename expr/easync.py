@@ -0,0 +1,125 @@
+# coding=utf-8
+# author=veficos
+
+import inspect
+
+from .east import *
+from .ecompiler import compile_ast, _member, _subscript, _call
+
+
+def _has_call(node):
+    if type(node) is FunctionCall:
+        return True
+    return any(_has_call(x) for x in children(node))
+
+
+def _build(node):
+    """Returns (function, is_async); subtrees without calls stay synchronous."""
+    if not _has_call(node):
+        return compile_ast(node), False
+
+    kind = type(node)
+    subs = [_build(x) for x in children(node)]
+
+    if kind is FunctionCall:
+        async def call(env):
+            values = await _gather(subs, env)
+            result = _call(env, values[0], *values[1:])
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+        return call, True
+
+    elif kind is Member:
+        member = node.member
+
+        async def member_(env):
+            obj, = await _gather(subs, env)
+            return _member(obj, member)
+        return member_, True
+
+    elif kind is Subscript:
+        async def subscript_(env):
+            obj, subscript = await _gather(subs, env)
+            return _subscript(obj, subscript)
+        return subscript_, True
+
+    elif kind is Negative:
+        async def negative(env):
+            value, = await _gather(subs, env)
+            return - value
+        return negative, True
+
+    elif kind is Not:
+        async def not_(env):
+            value, = await _gather(subs, env)
+            return not value
+        return not_, True
+
+    elif kind is LogicalAnd:
+        lhs, rhs = subs
+
+        async def logical_and(env):
+            value = await _run(lhs, env)
+            return (await _run(rhs, env)) if value else value
+        return logical_and, True
+
+    elif kind is LogicalOr:
+        lhs, rhs = subs
+
+        async def logical_or(env):
+            value = await _run(lhs, env)
+            return value if value else (await _run(rhs, env))
+        return logical_or, True
+
+    elif kind is If:
+        yes, condition, no = subs
+
+        async def if_(env):
+            if await _run(condition, env):
+                return await _run(yes, env)
+            return await _run(no, env)
+        return if_, True
+
+    op = binary_operators[kind]
+
+    async def binary(env):
+        lhs, rhs = await _gather(subs, env)
+        return op(lhs, rhs)
+    return binary, True
+
+
+async def _run(sub, env):
+    function, is_async = sub
+    if is_async:
+        return await function(env)
+    return function(env)
+
+
+async def _gather(subs, env):
+    pending = [i for i, (_, is_async) in enumerate(subs) if is_async]
+    values = [None if is_async else function(env) for function, is_async in subs]
+    if len(pending) == 1:
+        values[pending[0]] = await subs[pending[0]][0](env)
+    elif pending:
+        # asyncio is already loaded whenever this runs; importing it at module
+        # level would put it on the path of every import expr
+        import asyncio
+        results = await asyncio.gather(*[subs[i][0](env) for i in pending])
+        for i, value in zip(pending, results):
+            values[i] = value
+    return values
+
+
+def compile_async(ast):
+    function, is_async = _build(ast)
+    if is_async:
+        return function
+
+    async def constant(env):
+        return function(env)
+    return constant
+
+
+async def aeval(ast, env):
+    return await compile_async(ast)(env)
@@ -0,0 +1,133 @@
+# coding=utf-8
+# author=veficos
+
+import json
+import multiprocessing
+
+from .elexer import Lexer, LexerError
+from .eparser import Parser, GrammarError
+from .eoptimizer import optimize
+from .eartifact import encode, decode
+from .ecompiler import compile_ast
+
+
+class RuleError(object):
+    """
+    A rule that failed to compile. line and column locate the error in the
+    rule file for line-per-rule files, and inside the expression text for
+    keyed JSON files where the rule is identified by name.
+    """
+
+    __slots__ = ('name', 'line', 'column', 'message', 'text')
+
+    def __init__(self, name, line, column, message, text):
+        self.name = name
+        self.line = line
+        self.column = column
+        self.message = message
+        self.text = text
+
+    def __repr__(self):
+        return '(RuleError: %s: %s at line %d, column %d)' % (self.name, self.message, self.line, self.column)
+
+    __str__ = __repr__
+
+
+def read_rules(stream):
+    """
+    Read a whole rule file in one pass and return [(name, text, line,
+    column)], where line and column locate the start of the text.
+    A file starting with "{" is a JSON object of name -> expression; any
+    other file holds one expression per line, named by its line number,
+    with blank lines and lines starting with "#" skipped.
+    """
+    content = stream.read()
+    if content.lstrip().startswith('{'):
+        # values that are not strings are kept so compile_rules reports them
+        return [(name, text, 1, 1) for name, text in json.loads(content).items()]
+
+    rules = []
+    for number, line in enumerate(content.splitlines(), 1):
+        text = line.strip()
+        if text and not text.startswith('#'):
+            rules.append((str(number), text, number, len(line) - len(line.lstrip()) + 1))
+    return rules
+
+
+def _parse(text, optimized):
+    """Return (blob, None) on success or (None, (line, column, message))."""
+    lexer = Lexer(text)
+    try:
+        ast = Parser(lexer).parse()
+        if optimized:
+            ast = optimize(ast)
+        return bytes(encode(ast)), None
+    except GrammarError as e:
+        line, column = (e.line, e.column) if e.line is not None else (1, 1)
+        return None, (line, column, e.message)
+    except LexerError as e:
+        line, column = lexer.location(lexer.pos)
+        return None, (line, column, str(e))
+    except Exception as e:
+        # one bad rule, e.g. nested past the recursion limit, must not sink the pack
+        return None, (1, 1, '%s: %s' % (type(e).__name__, e))
+
+
+def _parse_chunk(chunk):
+    texts, optimized = chunk
+    return [_parse(x, optimized) for x in texts]
+
+
+def compile_rules(rules, workers=None, chunksize=512, optimized=True, numeric=None):
+    """
+    Compile [(name, text, line, column)] as returned by read_rules. Identical texts
+    are parsed once, and parsing runs across worker processes unless
+    workers <= 1. Returns (functions, errors): a dict of name -> compiled
+    function and a list of RuleError in file order. The pack bypasses the
+    AST cache, which is bounded and would evict most of it.
+    """
+    # folding uses int/Decimal arithmetic, numeric modes apply their own rules
+    optimized = optimized and numeric is None
+
+    names = {}
+    errors = []
+    for index, (name, text, line, column) in enumerate(rules):
+        if not isinstance(text, str):
+            errors.append((index, RuleError(name, line, column, 'expected a string expression', repr(text))))
+            continue
+        names.setdefault(text, []).append((index, name, line, column))
+    texts = list(names)
+
+    chunks = [(texts[i:i + chunksize], optimized) for i in range(0, len(texts), chunksize)]
+    if workers is not None and workers <= 1 or len(chunks) <= 1:
+        parsed = [_parse_chunk(x) for x in chunks]
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            parsed = pool.map(_parse_chunk, chunks)
+
+    functions = {}
+    for (chunk, _), results in zip(chunks, parsed):
+        for text, (blob, error) in zip(chunk, results):
+            if error is None:
+                try:
+                    function = compile_ast(decode(blob), numeric=numeric)
+                except Exception as e:
+                    error = (1, 1, '%s: %s' % (type(e).__name__, e))
+                else:
+                    for _, name, _, _ in names[text]:
+                        functions[name] = function
+                    continue
+            line, column, message = error
+            for index, name, start, offset in names[text]:
+                # the text was stripped, so shift columns on its first line
+                shift = offset - 1 if line == 1 else 0
+                errors.append((index, RuleError(name, start + line - 1, column + shift, message, text)))
+
+    errors.sort(key=lambda x: x[0])
+    return functions, [x for _, x in errors]
+
+
+def load_rules(path, workers=None, chunksize=512, optimized=True, numeric=None):
+    with open(path, encoding='utf-8') as stream:
+        rules = read_rules(stream)
+    return compile_rules(rules, workers, chunksize, optimized, numeric)
@@ -0,0 +1,142 @@
+# coding=utf-8
+# author=veficos
+
+import threading
+from collections import OrderedDict
+
+from .elexer import Lexer
+from .eparser import Parser
+from .ecompiler import compile_ast
+from .eoptimizer import optimize
+
+
+class ASTCache(object):
+    def __init__(self, maxsize=1024, optimized=True):
+        self.maxsize = maxsize
+        self.optimized = optimized
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.functions = {}
+        self.async_functions = {}
+        self.variants = {}
+        self.artifacts = []
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, text):
+        with self.lock:
+            ast = self.entries.get(text, None)
+            if ast is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(text)
+            self.hits += 1
+            return ast
+
+    def put(self, text, ast):
+        with self.lock:
+            self.entries[text] = ast
+            self.entries.move_to_end(text)
+            self.__evict()
+
+    def parse(self, text):
+        ast = self.get(text)
+        if ast is None:
+            ast = self.__load(text)
+            if ast is None:
+                ast = Parser(Lexer(text)).parse()
+                if self.optimized:
+                    ast = optimize(ast)
+            self.put(text, ast)
+        return ast
+
+    def attach(self, artifact):
+        self.artifacts.append(artifact)
+
+    def __load(self, text):
+        for artifact in self.artifacts:
+            ast = artifact.get(text)
+            if ast is not None:
+                if self.optimized and not artifact.optimized:
+                    ast = optimize(ast)
+                return ast
+        return None
+
+    def compile(self, text, numeric=None):
+        if numeric is None:
+            return self.__compile(text, self.functions, compile_ast)
+        # the cached tree was folded with int/Decimal arithmetic, so a mode
+        # compiles from a fresh, unoptimized parse and applies its own rules
+        return self.__compile(text, self.variants,
+                              lambda ast: compile_ast(Parser(Lexer(text)).parse(), numeric=numeric), numeric)
+
+    def compile_async(self, text):
+        # imported here so that asyncio stays out of a plain import expr
+        from .easync import compile_async
+        return self.__compile(text, self.async_functions, compile_async)
+
+    def __compile(self, text, functions, compiler, variant=None):
+        if variant is None:
+            function = functions.get(text, None)
+        else:
+            function = functions.get(text, {}).get(variant, None)
+        if function is None:
+            function = compiler(self.parse(text))
+            with self.lock:
+                if text in self.entries:
+                    if variant is None:
+                        functions[text] = function
+                    else:
+                        functions.setdefault(text, {})[variant] = function
+        else:
+            with self.lock:
+                if text in self.entries:
+                    self.entries.move_to_end(text)
+                self.hits += 1
+        return function
+
+    def resize(self, maxsize):
+        with self.lock:
+            self.maxsize = maxsize
+            self.__evict()
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.functions.clear()
+            self.async_functions.clear()
+            self.variants.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self):
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self.entries),
+                'maxsize': self.maxsize,
+            }
+
+    def __evict(self):
+        while len(self.entries) > max(self.maxsize, 0):
+            text, _ = self.entries.popitem(last=False)
+            self.functions.pop(text, None)
+            self.async_functions.pop(text, None)
+            self.variants.pop(text, None)
+            self.evictions += 1
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, text):
+        return text in self.entries
+
+    def __repr__(self):
+        return '(ASTCache: %s)' % str(self.stats())
+
+
+default_cache = ASTCache()
@@ -0,0 +1,164 @@
+# coding=utf-8
+# author=veficos
+
+from .east import *
+from .epure import PureFunction
+
+
+class CompileError(Exception):
+    pass
+
+
+def _member(obj, member):
+    if isinstance(obj, dict):
+        return obj.get(member, NilConstant(None))
+    return NilConstant(None)
+
+
+def _call(env, function, *args):
+    if type(function) is PureFunction:
+        return function.call(env, args)
+    return function(*args)
+
+
+def _subscript(obj, subscript):
+    try:
+        if isinstance(obj, list):
+            return obj[subscript]
+        elif isinstance(obj, dict):
+            return obj.get(subscript, NilConstant(None))
+    except:
+        pass
+    return NilConstant(None)
+
+
+_operators = {
+    Multiply: '*',
+    Divide: '/',
+    IntegerDivide: '%',
+    Add: '+',
+    Subtract: '-',
+    LessOrEqual: '<=',
+    GreaterOrEqual: '>=',
+    LessThan: '<',
+    GreaterThan: '>',
+    Equal: '==',
+    UnEqual: '!=',
+    LogicalAnd: 'and',
+    LogicalOr: 'or',
+}
+
+
+class _CodeGenerator(object):
+    def __init__(self, bindings=None, numeric=None):
+        self.constants = {}
+        self.bindings = bindings or {}
+        self.numeric = numeric
+
+    def read(self, code):
+        if self.numeric is None or self.numeric.read is None:
+            return code
+        return '%s(%s)' % (self.numeric.read, code)
+
+    def write(self, code):
+        if self.numeric is None or self.numeric.write is None:
+            return code
+        return '%s(%s)' % (self.numeric.write, code)
+
+    def constant(self, value):
+        name = '_c%d' % len(self.constants)
+        self.constants[name] = value
+        return name
+
+    def generate(self, node):
+        kind = type(node)
+
+        if kind is IntegerConstant or kind is DecimalConstant:
+            value = node.eval(None)
+            return self.constant(self.numeric.literal(value) if self.numeric is not None else value)
+        elif kind is BoolConstant or kind is StringConstant:
+            return self.constant(node.eval(None))
+        elif kind is NilConstant:
+            return 'None'
+        elif kind is Symbol:
+            if str(node) in self.bindings:
+                return self.read(self.constant(self.bindings[str(node)]))
+            return self.read('_get(%s)' % self.constant(str(node)))
+        elif kind is Member:
+            return self.read('_member(%s, %s)' % (self.generate(node.obj), self.constant(node.member)))
+        elif kind is Subscript:
+            return self.read('_subscript(%s, %s)' % (self.generate(node.obj), self.write(self.generate(node.subscript))))
+        elif kind is FunctionCall:
+            args = [self.write(self.generate(x)) for x in node.args]
+            return self.read('_call(%s)' % ', '.join(['env', self.generate(node.function)] + args))
+        elif self.numeric is not None and kind in self.numeric.operators:
+            return '%s(%s, %s)' % (self.numeric.operators[kind], self.generate(node.lhs), self.generate(node.rhs))
+        elif kind is Negative:
+            return '(-%s)' % self.generate(node.value)
+        elif kind is Not:
+            return '(not %s)' % self.generate(node.value)
+        elif kind in _operators:
+            return '(%s %s %s)' % (self.generate(node.lhs), _operators[kind], self.generate(node.rhs))
+        elif kind is If:
+            return '(%s if %s else %s)' % (self.generate(node.yes), self.generate(node.condition),
+                                          self.generate(node.no))
+        raise CompileError('unsupported node: %s' % repr(node))
+
+
+def compile_source(ast, bindings=None, numeric=None):
+    generator = _CodeGenerator(bindings, numeric)
+    body = generator.write(generator.generate(ast))
+    if numeric is not None and numeric.context() is not None:
+        source = 'def _expr(env):\n    _get = env.get_object\n    with _n_context():\n        return %s\n' % body
+    else:
+        source = 'def _expr(env):\n    _get = env.get_object\n    return %s\n' % body
+    return source, generator.constants
+
+
+def compile_ast(ast, bindings=None, numeric=None):
+    """
+    bindings maps symbol names to values fixed at compile time; numeric is
+    an enumeric.NumericMode deciding literal types and arithmetic.
+    """
+    try:
+        source, constants = compile_source(ast, bindings, numeric)
+        code = compile(source, '<expr>', 'exec')
+    except (SyntaxError, RecursionError, MemoryError) as e:
+        # CPython caps nested parentheses at 200, so long operator chains
+        # cannot become one Python expression; walk the tree instead
+        if numeric is not None:
+            raise CompileError('expression too complex: %s' % e)
+        return _interpret(ast, bindings)
+
+    namespace = {'_member': _member, '_subscript': _subscript, '_call': _call}
+    if numeric is not None:
+        namespace.update(numeric.helpers())
+        namespace['_n_context'] = numeric.context
+    namespace.update(constants)
+    exec(code, namespace)
+    return namespace['_expr']
+
+
+class _Bound(object):
+    """env seen through compile time bindings, for the tree-walking fallback."""
+
+    def __init__(self, env, bindings):
+        self.env = env
+        self.bindings = bindings
+
+    def get_object(self, name):
+        if name in self.bindings:
+            return self.bindings[name]
+        return self.env.get_object(name)
+
+    def __getattr__(self, name):
+        return getattr(self.env, name)
+
+
+def _interpret(ast, bindings):
+    if not bindings:
+        return ast.eval
+
+    def _expr(env):
+        return ast.eval(_Bound(env, bindings))
+    return _expr
@@ -0,0 +1,153 @@
+# coding=utf-8
+# author=veficos
+
+from .east import *
+
+
+def format_path(path):
+    text = str(path[0])
+    for segment in path[1:]:
+        text += '[%d]' % segment if isinstance(segment, int) else '.%s' % segment
+    return text
+
+
+class Dependencies(object):
+    """
+    What an expression can read from its Environment. Each path is a tuple
+    of a root name followed by member names and constant subscripts; the
+    value at a path and everything below it may be read. Paths in dynamic
+    were followed by a subscript that is only known at evaluation time.
+    """
+
+    def __init__(self, paths=None, dynamic=None):
+        self.paths = set(paths or ())
+        self.dynamic = set(dynamic or ())
+
+    @property
+    def roots(self):
+        return set(x[0] for x in self.paths)
+
+    @property
+    def is_dynamic(self):
+        return bool(self.dynamic)
+
+    def union(self, other):
+        return Dependencies(self.paths | other.paths, self.dynamic | other.dynamic)
+
+    def minimal(self):
+        """Paths with any path already covered by a shorter prefix removed."""
+        paths = sorted(self.paths, key=len)
+        kept = []
+        for path in paths:
+            if not any(path[:len(x)] == x for x in kept):
+                kept.append(path)
+        return set(kept)
+
+    def as_dict(self):
+        return {
+            'roots': sorted(self.roots),
+            'paths': sorted(format_path(x) for x in self.minimal()),
+            'dynamic': sorted(format_path(x) for x in self.dynamic),
+        }
+
+    def __eq__(self, other):
+        return isinstance(other, Dependencies) and self.paths == other.paths and self.dynamic == other.dynamic
+
+    def __repr__(self):
+        return '(Dependencies: %s)' % str(self.as_dict())
+
+
+def _path(node):
+    if type(node) is Symbol:
+        return (str(node),)
+    elif type(node) is Member:
+        path = _path(node.obj)
+        return path + (node.member,) if path is not None else None
+    elif type(node) is Subscript and type(node.subscript) in (IntegerConstant, StringConstant):
+        path = _path(node.obj)
+        return path + (node.subscript.value,) if path is not None else None
+    return None
+
+
+def _collect(node, deps):
+    path = _path(node)
+    if path is not None:
+        deps.paths.add(path)
+        return
+
+    if type(node) is Subscript:
+        prefix = _path(node.obj)
+        if prefix is not None:
+            # the index is unknown, so everything under the prefix is reachable
+            deps.paths.add(prefix)
+            deps.dynamic.add(prefix)
+            _collect(node.subscript, deps)
+            return
+
+    for child in children(node):
+        _collect(child, deps)
+
+
+def dependencies(ast):
+    deps = Dependencies()
+    _collect(ast, deps)
+    return deps
+
+
+def eager_roots(ast):
+    """
+    Root names read on every evaluation of ast: those outside the right
+    operand of && and ||, and outside both branches of if.
+    """
+    roots = set()
+    stack = [ast]
+    while stack:
+        node = stack.pop()
+        kind = type(node)
+        if kind is Symbol:
+            roots.add(str(node))
+        elif kind is LogicalAnd or kind is LogicalOr:
+            stack.append(node.lhs)
+        elif kind is If:
+            stack.append(node.condition)
+        else:
+            stack.extend(children(node))
+    return roots
+
+
+def union(asts):
+    deps = Dependencies()
+    for ast in asts:
+        _collect(ast, deps)
+    return deps
+
+
+def project(objects, deps):
+    """
+    Copy only the parts of objects (name -> value) that deps can read.
+    Lists keep their length, with unread slots left as None.
+    """
+    projected = {}
+    for path in sorted(deps.minimal(), key=len):
+        if path[0] not in objects:
+            continue
+        _graft(projected, objects, path)
+    return projected
+
+
+def _graft(target, source, path):
+    key = path[0]
+    try:
+        value = source[key]
+    except (KeyError, IndexError, TypeError):
+        return
+
+    if len(path) == 1 or not isinstance(value, (dict, list)):
+        target[key] = value
+        return
+
+    branch = target.get(key, None) if isinstance(target, dict) else target[key]
+    if type(branch) is not type(value):
+        branch = {} if isinstance(value, dict) else [None] * len(value)
+        target[key] = branch
+    _graft(branch, value, path[1:])
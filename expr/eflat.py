@@ -0,0 +1,170 @@
+# coding=utf-8
+# author=veficos
+
+import sys
+from array import array
+
+from .east import *
+from .ecompiler import _member, _subscript, _call
+
+
+class FlatError(Exception):
+    pass
+
+
+class Kind:
+    Constant = 0
+    Symbol = 1
+    Member = 2
+    Subscript = 3
+    FunctionCall = 4
+    Negative = 5
+    Not = 6
+    LogicalAnd = 7
+    LogicalOr = 8
+    If = 9
+    Binary = 10
+
+
+_binary_kinds = list(binary_operators.keys())
+
+_binary_functions = [binary_operators[x] for x in _binary_kinds]
+
+
+class FlatTree(object):
+    """
+    Struct-of-arrays tree: node i has kind kinds[i] and up to three operands
+    in first/second/third. Operands are child node indices, constant pool
+    indices or, for function calls, a (start, count) slice of argv.
+    """
+
+    def __init__(self):
+        self.kinds = array('B')
+        self.first = array('i')
+        self.second = array('i')
+        self.third = array('i')
+        self.argv = array('i')
+        self.constants = []
+        self.root = -1
+
+    def add(self, kind, first=0, second=0, third=0):
+        self.kinds.append(kind)
+        self.first.append(first)
+        self.second.append(second)
+        self.third.append(third)
+        return len(self.kinds) - 1
+
+    def constant(self, value):
+        self.constants.append(value)
+        return len(self.constants) - 1
+
+    def eval(self, env):
+        return self.__eval(self.root, env)
+
+    def __eval(self, i, env):
+        kind = self.kinds[i]
+
+        if kind >= Kind.Binary:
+            return _binary_functions[kind - Kind.Binary](self.__eval(self.first[i], env),
+                                                        self.__eval(self.second[i], env))
+        elif kind == Kind.Constant:
+            return self.constants[self.first[i]]
+        elif kind == Kind.Symbol:
+            return env.get_object(self.constants[self.first[i]])
+        elif kind == Kind.Member:
+            return _member(self.__eval(self.first[i], env), self.constants[self.second[i]])
+        elif kind == Kind.Subscript:
+            return _subscript(self.__eval(self.first[i], env), self.__eval(self.second[i], env))
+        elif kind == Kind.FunctionCall:
+            function = self.__eval(self.first[i], env)
+            start = self.second[i]
+            args = [self.__eval(x, env) for x in self.argv[start:start + self.third[i]]]
+            return _call(env, function, *args)
+        elif kind == Kind.Negative:
+            return - self.__eval(self.first[i], env)
+        elif kind == Kind.Not:
+            return not self.__eval(self.first[i], env)
+        elif kind == Kind.LogicalAnd:
+            return self.__eval(self.first[i], env) and self.__eval(self.second[i], env)
+        elif kind == Kind.LogicalOr:
+            return self.__eval(self.first[i], env) or self.__eval(self.second[i], env)
+        elif kind == Kind.If:
+            if self.__eval(self.second[i], env):
+                return self.__eval(self.first[i], env)
+            return self.__eval(self.third[i], env)
+        raise FlatError('bad node kind %d at %d' % (kind, i))
+
+    def nbytes(self):
+        size = sys.getsizeof(self)
+        for x in (self.kinds, self.first, self.second, self.third, self.argv):
+            size += sys.getsizeof(x)
+        size += sys.getsizeof(self.constants) + sum(sys.getsizeof(x) for x in self.constants)
+        return size
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __repr__(self):
+        return '(FlatTree: %d nodes, %d constants)' % (len(self.kinds), len(self.constants))
+
+
+def flatten(ast, tree=None):
+    if tree is None:
+        tree = FlatTree()
+        tree.root = flatten(ast, tree)
+        return tree
+
+    kind = type(ast)
+    if isinstance(ast, Constant):
+        return tree.add(Kind.Constant, tree.constant(ast.eval(None)))
+    elif kind is Symbol:
+        return tree.add(Kind.Symbol, tree.constant(str(ast)))
+    elif kind is Member:
+        return tree.add(Kind.Member, flatten(ast.obj, tree), tree.constant(ast.member))
+    elif kind is Subscript:
+        return tree.add(Kind.Subscript, flatten(ast.obj, tree), flatten(ast.subscript, tree))
+    elif kind is FunctionCall:
+        function = flatten(ast.function, tree)
+        args = [flatten(x, tree) for x in ast.args]
+        start = len(tree.argv)
+        tree.argv.extend(args)
+        return tree.add(Kind.FunctionCall, function, start, len(args))
+    elif kind is Negative:
+        return tree.add(Kind.Negative, flatten(ast.value, tree))
+    elif kind is Not:
+        return tree.add(Kind.Not, flatten(ast.value, tree))
+    elif kind is LogicalAnd:
+        return tree.add(Kind.LogicalAnd, flatten(ast.lhs, tree), flatten(ast.rhs, tree))
+    elif kind is LogicalOr:
+        return tree.add(Kind.LogicalOr, flatten(ast.lhs, tree), flatten(ast.rhs, tree))
+    elif kind is If:
+        return tree.add(Kind.If, flatten(ast.yes, tree), flatten(ast.condition, tree), flatten(ast.no, tree))
+    elif kind in binary_operators:
+        return tree.add(Kind.Binary + _binary_kinds.index(kind), flatten(ast.lhs, tree), flatten(ast.rhs, tree))
+    raise FlatError('unsupported node: %s' % repr(ast))
+
+
+def sizeof(expr):
+    """Approximate bytes held by a tree, flat tree or assembled program."""
+    if hasattr(expr, 'nbytes'):
+        return expr.nbytes()
+    if hasattr(expr, 'codes') and hasattr(expr, 'constants'):
+        return (sys.getsizeof(expr) + sys.getsizeof(expr.codes) + sys.getsizeof(expr.args) +
+                sys.getsizeof(expr.constants) + sum(sys.getsizeof(x) for x in expr.constants))
+
+    seen = set()
+    size = 0
+    stack = [expr]
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        size += sys.getsizeof(node)
+        if isinstance(node, (list, tuple)):
+            stack.extend(node)
+        elif not isinstance(node, str):
+            for klass in type(node).__mro__:
+                for name in klass.__dict__.get('__slots__', ()):
+                    stack.append(getattr(node, name))
+    return size
@@ -0,0 +1,177 @@
+# coding=utf-8
+# author=veficos
+
+import bisect
+
+from .east import *
+from .ecache import default_cache
+from .ecompiler import compile_ast
+from .edepend import _path
+
+
+_flipped = {LessThan: GreaterThan, LessOrEqual: GreaterOrEqual, GreaterThan: LessThan, GreaterOrEqual: LessOrEqual}
+
+_ranges = (LessThan, LessOrEqual, GreaterThan, GreaterOrEqual)
+
+
+def _conjuncts(node):
+    if type(node) is LogicalAnd:
+        return _conjuncts(node.lhs) + _conjuncts(node.rhs)
+    return [node]
+
+
+def _constant(node):
+    return type(node) in (IntegerConstant, DecimalConstant, StringConstant, BoolConstant)
+
+
+def predicate(node):
+    """(path, node kind, path node, constant) for 'path op constant' or 'constant op path'."""
+    kind = type(node)
+    if kind is not Equal and kind not in _ranges:
+        return None
+
+    lhs, rhs = node.lhs, node.rhs
+    if _constant(lhs) and _path(rhs) is not None:
+        lhs, rhs = rhs, lhs
+        kind = _flipped.get(kind, kind)
+    if _path(lhs) is None or not _constant(rhs):
+        return None
+    return _path(lhs), kind, lhs, rhs.eval(None)
+
+
+def _family(value):
+    # bounds of different families cannot be ordered against each other
+    return str if isinstance(value, str) else 'number'
+
+
+class _Rule(object):
+    __slots__ = ('id', 'order', 'text', 'function')
+
+    def __init__(self, id, order, text, function):
+        self.id = id
+        self.order = order
+        self.text = text
+        self.function = function
+
+
+class _Bounds(object):
+    """Rules keyed by the constant of 'path > c' (or 'path < c'), sorted."""
+
+    def __init__(self):
+        self.bounds = []
+        self.rules = []
+
+    def add(self, bound, rule):
+        i = bisect.bisect_right(self.bounds, bound)
+        self.bounds.insert(i, bound)
+        self.rules.insert(i, rule)
+
+    def below(self, value):
+        return self.rules[:bisect.bisect_right(self.bounds, value)]
+
+    def above(self, value):
+        return self.rules[bisect.bisect_left(self.bounds, value):]
+
+
+class RuleIndex(object):
+    def __init__(self, cache=None):
+        self.cache = cache if cache is not None else default_cache
+        self.rules = {}
+        self.paths = {}
+        self.equal = {}
+        self.lower = {}
+        self.upper = {}
+        self.unindexed = []
+        self.evaluated = 0
+        self.errors = 0
+
+    def add(self, id, text):
+        if id in self.rules:
+            raise KeyError('duplicate rule id: %s' % id)
+
+        ast = self.cache.parse(text)
+        rule = _Rule(id, len(self.rules), text, self.cache.compile(text))
+        self.rules[id] = rule
+
+        predicates = [x for x in map(predicate, _conjuncts(ast)) if x is not None]
+        predicates.sort(key=lambda x: x[1] is not Equal)
+        for path, kind, node, value in predicates:
+            if kind is Equal:
+                try:
+                    self.equal.setdefault(path, {}).setdefault(value, []).append(rule)
+                except TypeError:
+                    continue
+            else:
+                ranges = self.lower if kind in (GreaterThan, GreaterOrEqual) else self.upper
+                try:
+                    ranges.setdefault(path, {}).setdefault(_family(value), _Bounds()).add(value, rule)
+                except TypeError:
+                    continue
+            if path not in self.paths:
+                self.paths[path] = compile_ast(node)
+            return
+
+        self.unindexed.append(rule)
+
+    def candidates(self, env):
+        found = {}
+        for rule in self.unindexed:
+            found[rule.order] = rule
+
+        for path, read in self.paths.items():
+            try:
+                value = read(env)
+            except Exception:
+                value = NilConstant(None)
+
+            buckets = self.equal.get(path, None)
+            if buckets:
+                try:
+                    rules = buckets.get(value, ())
+                except TypeError:
+                    rules = [x for rules in buckets.values() for x in rules]
+                for rule in rules:
+                    found[rule.order] = rule
+
+            for families, side in ((self.lower.get(path, None), 'below'), (self.upper.get(path, None), 'above')):
+                if families is None:
+                    continue
+                for bounds in families.values():
+                    try:
+                        rules = getattr(bounds, side)(value)
+                    except TypeError:
+                        rules = bounds.rules
+                    for rule in rules:
+                        found[rule.order] = rule
+
+        return [found[x] for x in sorted(found)]
+
+    def match(self, env):
+        matched = []
+        for rule in self.candidates(env):
+            self.evaluated += 1
+            try:
+                if rule.function(env):
+                    matched.append(rule.id)
+            except Exception:
+                self.errors += 1
+        return matched
+
+    def stats(self):
+        return {
+            'rules': len(self.rules),
+            'paths': len(self.paths),
+            'equal': sum(len(rules) for buckets in self.equal.values() for rules in buckets.values()),
+            'range': sum(len(x.rules) for ranges in (self.lower, self.upper)
+                         for families in ranges.values() for x in families.values()),
+            'unindexed': len(self.unindexed),
+            'evaluated': self.evaluated,
+            'errors': self.errors,
+        }
+
+    def __len__(self):
+        return len(self.rules)
+
+    def __repr__(self):
+        return '(RuleIndex: %s)' % str(self.stats())
+
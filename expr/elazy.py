@@ -0,0 +1,154 @@
+# coding=utf-8
+# author=veficos
+
+import contextlib
+
+from .executor import Environment
+
+
+_missing = object()
+
+
+class _Loaders(object):
+    def __init__(self):
+        self.loader = None
+        self.batch = None
+        self.children = {}
+
+    def child(self, name):
+        node = self.children.get(name, None)
+        if node is None:
+            node = self.children[name] = _Loaders()
+        return node
+
+    def load(self, env):
+        if self.loader is None:
+            return self.wrap({} if self.children else None, env)
+        env.loads += 1
+        return self.wrap(self.loader(), env)
+
+    def wrap(self, value, env):
+        if self.children and isinstance(value, dict) and not isinstance(value, LazyDict):
+            return LazyDict(value, self, env)
+        return value
+
+
+class LazyDict(dict):
+    """A dict whose missing keys are filled by loaders on first get()."""
+
+    def __init__(self, value, loaders, env):
+        super(LazyDict, self).__init__(value)
+        self.loaders = loaders
+        self.env = env
+
+    def get(self, key, default=None):
+        if key in self:
+            return dict.__getitem__(self, key)
+        node = self.loaders.children.get(key, None)
+        if node is None:
+            return default
+        value = self[key] = node.load(self.env)
+        return value
+
+    def __getitem__(self, key):
+        value = self.get(key, _missing)
+        if value is _missing:
+            raise KeyError(key)
+        return value
+
+
+class LazyEnvironment(Environment):
+    def __init__(self):
+        super(LazyEnvironment, self).__init__()
+        self.loaders = _Loaders()
+        self.loaded = {}
+        self.loads = 0
+        self.batches = 0
+
+    def push_object(self, name, value):
+        self.loaded.pop(name, None)
+        super(LazyEnvironment, self).push_object(name, value)
+
+    def pop_object(self, name):
+        self.loaded.pop(name, None)
+        super(LazyEnvironment, self).pop_object(name)
+
+    def push_loader(self, path, loader):
+        """Loader for a name or a dotted member path such as 'user.profile'."""
+        node = self.loaders
+        for name in path.split('.'):
+            node = node.child(name)
+        node.loader = loader
+        self.loaded.pop(path.split('.')[0], None)
+
+    def push_batch_loader(self, names, loader):
+        """loader(list_of_names) returns a dict with a value for each name."""
+        for name in names:
+            self.loaders.child(name).batch = loader
+            self.loaded.pop(name, None)
+
+    def reset(self):
+        """Forget loaded values, e.g. before the next evaluation."""
+        self.loaded.clear()
+        self.clear_memo()
+
+    @contextlib.contextmanager
+    def evaluation(self, names=()):
+        """
+        Scope loaded values to one evaluation. names, usually the roots an
+        expression reads on every run, are prefetched up front so that names
+        sharing a batch loader arrive in a single call. Executor enters this
+        around every evaluation.
+        """
+        self.reset()
+        try:
+            self.prefetch(names)
+            yield self
+        finally:
+            self.reset()
+
+    def prefetch(self, names):
+        """
+        Load the missing batch-loaded names at once, one call per batch
+        loader. Names with a loader of their own still wait for their first
+        get_object, so a read that is short-circuited away never loads.
+        """
+        groups = {}
+        for name in names:
+            if name in self.loaded or name in self.objects:
+                continue
+            node = self.loaders.children.get(name, None)
+            if node is not None and node.batch is not None:
+                groups.setdefault(node.batch, []).append(name)
+
+        for loader, group in groups.items():
+            self.batches += 1
+            self.loads += len(group)
+            values = loader(group)
+            for name in group:
+                self.loaded[name] = self.loaders.children[name].wrap(values.get(name, None), self)
+
+    def get_object(self, name):
+        value = self.loaded.get(name, _missing)
+        if value is not _missing:
+            return value
+
+        node = self.loaders.children.get(name, None)
+        value = self.objects.get(name, _missing)
+        if value is not _missing:
+            if node is None or not node.children:
+                return value
+            value = self.loaded[name] = node.wrap(value, self)
+            return value
+
+        if node is None:
+            return None
+        if node.batch is not None:
+            self.prefetch([name])
+            return self.loaded[name]
+
+        value = self.loaded[name] = node.load(self)
+        return value
+
+    def __repr__(self):
+        return '(LazyEnvironment: %s, loaded: %s)' % (str(self.objects), sorted(self.loaded.keys()))
@@ -0,0 +1,158 @@
+# coding=utf-8
+# author=veficos
+
+import decimal
+
+from .east import *
+
+
+class NumericMode(object):
+    """
+    How the compiler treats numbers: what integer and decimal literals
+    become, and which helpers replace the native arithmetic operators.
+    The default keeps Python ints and decimal.Decimal with the current
+    context, exactly like tree-walking eval.
+    """
+
+    name = 'default'
+
+    # node kind -> helper name used instead of the native operator
+    operators = {}
+
+    # helper wrapped around every value read from the environment, and
+    # around every value handed back out (call arguments, indices, result)
+    read = None
+    write = None
+
+    def literal(self, value):
+        return value
+
+    def helpers(self):
+        return {}
+
+    def context(self):
+        return None
+
+    def key(self):
+        """Settings that tell modes apart; compiled variants are cached by it."""
+        return ()
+
+    def __eq__(self, other):
+        return type(other) is type(self) and other.key() == self.key()
+
+    def __hash__(self):
+        return hash((type(self), self.key()))
+
+    def __repr__(self):
+        return '(NumericMode: %s)' % self.name
+
+
+class DecimalMode(NumericMode):
+    name = 'decimal'
+
+    def __init__(self, context=None):
+        self.decimal_context = context if context is not None else decimal.Context()
+
+    def literal(self, value):
+        if isinstance(value, decimal.Decimal):
+            return self.decimal_context.create_decimal(value)
+        return value
+
+    def context(self):
+        return decimal.localcontext(self.decimal_context)
+
+    def key(self):
+        ctx = self.decimal_context
+        traps = tuple(sorted(x.__name__ for x, on in ctx.traps.items() if on))
+        return ctx.prec, ctx.rounding, ctx.Emin, ctx.Emax, ctx.capitals, ctx.clamp, traps
+
+
+def _to_float(value):
+    return float(value) if isinstance(value, decimal.Decimal) else value
+
+
+class FloatMode(NumericMode):
+    name = 'float'
+
+    read = '_n_in'
+
+    def literal(self, value):
+        return _to_float(value)
+
+    def helpers(self):
+        return {'_n_in': _to_float}
+
+
+def _round_div(n, d):
+    """n / d rounded half to even, for ints."""
+    if d < 0:
+        n, d = -n, -d
+    q, r = divmod(n, d)
+    twice = 2 * r
+    if twice > d or (twice == d and q % 2):
+        q += 1
+    return q
+
+
+class ScaledMode(NumericMode):
+    """
+    Fixed point: every number is an int holding value * 10**scale. Values
+    read from the environment are scaled on the way in; values handed to
+    functions, used as indices or returned are scaled back to int when
+    integral and to Decimal otherwise.
+    """
+
+    name = 'scaled'
+
+    operators = {Multiply: '_n_mul', Divide: '_n_div'}
+
+    read = '_n_in'
+    write = '_n_out'
+
+    def __init__(self, scale=2):
+        self.scale = scale
+        self.factor = 10 ** scale
+
+    def literal(self, value):
+        if type(value) is int:
+            return value * self.factor
+        elif isinstance(value, decimal.Decimal):
+            return int((value * self.factor).to_integral_value(decimal.ROUND_HALF_EVEN))
+        elif isinstance(value, float):
+            return int(round(value * self.factor))
+        return value
+
+    def helpers(self):
+        factor = self.factor
+        scale = self.scale
+        literal = self.literal
+
+        def scaled_in(value):
+            if type(value) is int or type(value) is float or isinstance(value, decimal.Decimal):
+                return literal(value)
+            return value
+
+        def scaled_out(value):
+            if type(value) is not int:
+                return value
+            q, r = divmod(value, factor)
+            return q if r == 0 else decimal.Decimal(value).scaleb(-scale)
+
+        def scaled_mul(lhs, rhs):
+            if type(lhs) is int and type(rhs) is int:
+                return _round_div(lhs * rhs, factor)
+            return scaled_in(scaled_out(lhs) * scaled_out(rhs))
+
+        def scaled_div(lhs, rhs):
+            if type(lhs) is int and type(rhs) is int:
+                return _round_div(lhs * factor, rhs)
+            return scaled_in(scaled_out(lhs) / scaled_out(rhs))
+
+        return {'_n_in': scaled_in, '_n_out': scaled_out, '_n_mul': scaled_mul, '_n_div': scaled_div}
+
+    def key(self):
+        return (self.scale,)
+
+    def __repr__(self):
+        return '(NumericMode: scaled/%d)' % self.scale
+
@@ -0,0 +1,205 @@
+# coding=utf-8
+# author=veficos
+
+import decimal
+
+from .east import *
+from .epure import PureFunction
+
+
+_constants = (IntegerConstant, DecimalConstant, BoolConstant, StringConstant, NilConstant)
+
+_predicates = (LessOrEqual, GreaterOrEqual, LessThan, GreaterThan, Equal, UnEqual, Not)
+
+
+def is_constant(node):
+    return isinstance(node, _constants)
+
+
+def to_constant(value):
+    if value is None:
+        return NilConstant(None)
+    elif isinstance(value, bool):
+        return BoolConstant(value)
+    elif isinstance(value, int):
+        return IntegerConstant(value)
+    elif isinstance(value, (decimal.Decimal, float)):
+        return DecimalConstant(value)
+    elif isinstance(value, str):
+        return StringConstant(value)
+    return None
+
+
+def count_nodes(node):
+    count = 0
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(children(node))
+    return count
+
+
+def _is_path(node):
+    while isinstance(node, Member):
+        node = node.obj
+    return isinstance(node, Symbol)
+
+
+def _is_predicate(node):
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (LogicalAnd, LogicalOr)):
+            stack.extend((node.lhs, node.rhs))
+        elif not isinstance(node, _predicates) and not isinstance(node, BoolConstant):
+            return False
+    return True
+
+
+class Optimizer(object):
+    """
+    With partial set, env holds bindings known ahead of time: reads that
+    resolve in it become constants and whatever depends on them is folded,
+    leaving a residual tree over the remaining symbols.
+    """
+
+    def __init__(self, env=None, partial=False):
+        self.env = env
+        self.partial = partial
+        self.removed = 0
+
+    def optimize(self, ast):
+        before = count_nodes(ast)
+        ast = self.__visit(ast)
+        self.removed += before - count_nodes(ast)
+        return ast
+
+    def __fold(self, node):
+        try:
+            constant = to_constant(node.eval(None))
+        except Exception:
+            # leave the node alone so the error still surfaces at evaluation time
+            return node
+        return constant if constant is not None else node
+
+    def __hoist(self, node):
+        # a pure function called with constant arguments can be run once, now
+        if not all(is_constant(x) for x in node.args) or not _is_path(node.function):
+            return node
+        try:
+            function = node.function.eval(self.env)
+            if type(function) is not PureFunction:
+                return node
+            constant = to_constant(function.call(self.env, tuple(x.eval(None) for x in node.args)))
+        except Exception:
+            return node
+        return constant if constant is not None else node
+
+    def __read(self, node):
+        # only a path of members and constant indices below a known symbol is
+        # resolved; anything else in it may depend on unknown bindings or call out
+        root = node
+        while isinstance(root, (Member, Subscript)):
+            if isinstance(root, Subscript) and not is_constant(root.subscript):
+                return node
+            root = root.obj
+        if not isinstance(root, Symbol) or self.env.get_object(str(root)) is None:
+            return node
+        try:
+            value = node.eval(self.env)
+        except Exception:
+            return node
+        if value is None or isinstance(value, NilConstant):
+            return node
+        constant = to_constant(value)
+        return constant if constant is not None else node
+
+    def __visit(self, root):
+        # post-order over an explicit stack, so long operator chains do not
+        # run into the recursion limit
+        done = []
+        stack = [(root, False)]
+        while stack:
+            node, expanded = stack.pop()
+            nodes = children(node)
+            if expanded or not nodes:
+                if nodes:
+                    values = done[-len(nodes):]
+                    del done[-len(nodes):]
+                else:
+                    values = []
+                done.append(self.__combine(node, values))
+            else:
+                stack.append((node, True))
+                stack.extend((x, False) for x in reversed(nodes))
+        return done[0]
+
+    def __combine(self, node, values):
+        # values are the optimized children of node, in east.children order
+        if isinstance(node, Symbol):
+            return self.__read(node) if self.partial else node
+
+        elif isinstance(node, Member):
+            obj, = values
+            node = Member(obj, node.member)
+            return self.__read(node) if self.partial and not is_constant(obj) else node
+
+        elif isinstance(node, Subscript):
+            obj, subscript = values
+            node = Subscript(obj, subscript)
+            return self.__read(node) if self.partial and not is_constant(obj) else node
+
+        elif isinstance(node, FunctionCall):
+            node = FunctionCall(values[0], values[1:])
+            return self.__hoist(node) if self.env is not None else node
+
+        elif isinstance(node, Negative):
+            value, = values
+            node = Negative(value)
+            return self.__fold(node) if is_constant(value) else node
+
+        elif isinstance(node, Not):
+            value, = values
+            # !!x is only x when x already yields a bool
+            if isinstance(value, Not) and _is_predicate(value.value):
+                return value.value
+            node = Not(value)
+            return self.__fold(node) if is_constant(value) else node
+
+        elif isinstance(node, LogicalAnd):
+            lhs, rhs = values
+            if is_constant(lhs):
+                return rhs if lhs.eval(None) else lhs
+            return LogicalAnd(lhs, rhs)
+
+        elif isinstance(node, LogicalOr):
+            lhs, rhs = values
+            if is_constant(lhs):
+                return lhs if lhs.eval(None) else rhs
+            return LogicalOr(lhs, rhs)
+
+        elif isinstance(node, Binary):
+            lhs, rhs = values
+            node = type(node)(lhs, rhs)
+            return self.__fold(node) if is_constant(lhs) and is_constant(rhs) else node
+
+        elif isinstance(node, If):
+            yes, condition, no = values
+            if is_constant(condition):
+                return yes if condition.eval(None) else no
+            return If(yes, condition, no)
+
+        return node
+
+
+def optimize(ast, env=None):
+    return Optimizer(env).optimize(ast)
+
+
+def specialize(ast, env):
+    """
+    Partially evaluate ast against the bindings known in env and return the
+    residual expression, to be evaluated later with the remaining bindings.
+    """
+    return Optimizer(env, partial=True).optimize(ast)
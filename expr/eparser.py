@@ -6,193 +6,211 @@ from .east import *
 
 
 class GrammarError(Exception):
-    pass
+    def __init__(self, message, position=None, line=None, column=None):
+        super(GrammarError, self).__init__(message)
+        self.message = message
+        self.position = position
+        self.line = line
+        self.column = column
+
+    def __str__(self):
+        if self.line is None:
+            return self.message
+        return '%s at line %d, column %d' % (self.message, self.line, self.column)
+
+
+# binding power of each binary operator, all left associative
+_binary = {
+    Token.Or: (1, LogicalOr),
+    Token.And: (2, LogicalAnd),
+    Token.Eq: (3, Equal),
+    Token.Neq: (3, UnEqual),
+    Token.Lt: (4, LessThan),
+    Token.Leq: (4, LessOrEqual),
+    Token.Gt: (4, GreaterThan),
+    Token.Geq: (4, GreaterOrEqual),
+    Token.Add: (5, Add),
+    Token.Sub: (5, Subtract),
+    Token.Mul: (6, Multiply),
+    Token.Div: (6, Divide),
+    Token.Mod: (6, IntegerDivide),
+}
+
+_unary = {
+    Token.Add: None,
+    Token.Sub: Negative,
+    Token.Not: Not,
+}
+
+_primary = {
+    Token.IntegerConstant: IntegerConstant,
+    Token.DecimalConstant: DecimalConstant,
+    Token.StringConstant: StringConstant,
+    Token.TrueConstant: BoolConstant,
+    Token.FalseConstant: BoolConstant,
+    Token.NilConstant: NilConstant,
+    Token.Identifier: Symbol,
+}
+
+# markers kept on the operator stack next to binary operators
+_Binary = 0
+_Unary = 1
+_Group = 2
+_Call = 3
+_Subscript = 4
+_If = 5
+_Else = 6
 
 
 class Parser(object):
+    """
+    Operator-precedence parser for the grammar in expr.y. Operands and
+    pending operators live on two explicit stacks, so nesting depth costs
+    list entries rather than Python frames.
+    """
+
     def __init__(self, lexer):
         self.lexer = lexer
 
-    def __parse_if_expression(self):
-        if_expr = self.__parse_or_expression()
-        tok, _ = self.lexer.peek()
-
-        while tok == Token.If:
-            self.lexer.next()
-            condition = self.parse()
-
-            tok, _ = self.lexer.next()
-            if tok != Token.Else:
-                raise GrammarError('excepted "else"')
-
-            else_expr = self.parse()
-            if_expr = If(if_expr, condition, else_expr)
-
-        return if_expr
-
-    def __parse_or_expression(self):
-        lexpr = self.__parse_and_expression()
-        tok, _ = self.lexer.peek()
-        while tok == Token.Or:
-            self.lexer.next()
-            rexpr = self.__parse_and_expression()
-            lexpr = LogicalOr(lexpr, rexpr)
-            tok, _ = self.lexer.peek()
-        return lexpr
-
-    def __parse_and_expression(self):
-        lexpr = self.__parse_equality_expression()
-        tok, _ = self.lexer.peek()
-        while tok == Token.And:
-            self.lexer.next()
-            rexpr = self.__parse_equality_expression()
-            lexpr = LogicalAnd(lexpr, rexpr)
-            tok, _ = self.lexer.peek()
-        return lexpr
-
-    def __parse_equality_expression(self):
-        to_ast = {Token.Eq: Equal, Token.Neq: UnEqual}
-        toks = to_ast.keys()
-
-        lexpr = self.__parse_relational_expression()
-        tok, _ = self.lexer.peek()
-        while any(map(lambda x: x == tok, toks)):
-            self.lexer.next()
-            rexpr = self.__parse_relational_expression()
-            lexpr = to_ast[tok](lexpr, rexpr)
-            tok, _ = self.lexer.peek()
-        return lexpr
-
-    def __parse_relational_expression(self):
-        to_ast = {Token.Lt: LessThan, Token.Leq: LessOrEqual, Token.Gt: GreaterThan, Token.Geq: GreaterOrEqual}
-        toks = to_ast.keys()
-
-        lexpr = self.__parse_additive_expression()
-        tok, _ = self.lexer.peek()
-        while any(map(lambda x: x == tok, toks)):
-            self.lexer.next()
-            rexpr = self.__parse_additive_expression()
-            lexpr = to_ast[tok](lexpr, rexpr)
-            tok, _ = self.lexer.peek()
-        return lexpr
-
-    def __parse_additive_expression(self):
-        to_ast = {Token.Add: Add, Token.Sub: Subtract}
-        toks = to_ast.keys()
-
-        lexpr = self.__parse_multiplicative_expression()
-        tok, _ = self.lexer.peek()
-        while any(map(lambda x: x == tok, toks)):
-            self.lexer.next()
-            rexpr = self.__parse_multiplicative_expression()
-            lexpr = to_ast[tok](lexpr, rexpr)
-            tok, _ = self.lexer.peek()
-        return lexpr
-
-    def __parse_multiplicative_expression(self):
-        to_ast = {Token.Mul: Multiply, Token.Div: Divide, Token.Mod: IntegerDivide}
-        toks = to_ast.keys()
-
-        lexpr = self.__parse_unary_expression()
-        tok, _ = self.lexer.peek()
-        while any(map(lambda x: x == tok, toks)):
-            self.lexer.next()
-            rexpr = self.__parse_unary_expression()
-            lexpr = to_ast[tok](lexpr, rexpr)
-            tok, _ = self.lexer.peek()
-        return lexpr
-
-    def __parse_unary_expression(self):
-        tok, _ = self.lexer.peek()
-        if tok == Token.Add:
-            self.lexer.next()
-            ast = self.__parse_postfix_expression()
-        elif tok == Token.Sub:
-            self.lexer.next()
-            ast = Negative(self.__parse_postfix_expression())
-        elif tok == Token.Not:
-            self.lexer.next()
-            ast = Not(self.__parse_postfix_expression())
-        else:
-            ast = self.__parse_postfix_expression()
-        return ast
-
-    def __parse_postfix_expression(self):
-        ast = self.__parse_primary_expression()
-        tok, _ = self.lexer.peek()
-
-        while any(map(lambda x: x == tok, [Token.LeftBracket, Token.LeftParentheses, Token.Dot])):
-            if tok == Token.LeftParentheses:
-                args = []
-                self.lexer.next()
-                tok, _ = self.lexer.peek()
-
-                while tok != Token.RightParentheses:
-                    args.append(self.parse())
-                    tok, _ = self.lexer.peek()
-                    if tok != Token.Comma:
-                        break
-                    tok, _ = self.lexer.next()
-
-                if tok != Token.RightParentheses:
-                    raise GrammarError('expected ")"')
-                self.lexer.next()
-
-                ast = FunctionCall(ast, args)
+    def __error(self, message, start=None):
+        start = self.lexer.start if start is None else start
+        line, column = self.lexer.location(start)
+        return GrammarError(message, start, line, column)
+
+    def __reduce_binary(self, values, ops):
+        while ops and ops[-1][0] == _Binary:
+            _, _, node = ops.pop()
+            rhs = values.pop()
+            values[-1] = node(values[-1], rhs)
+
+    def __reduce(self, values, ops):
+        while True:
+            self.__reduce_binary(values, ops)
+            if not ops or ops[-1][0] != _Else:
+                return
+            ops.pop()
+            no = values.pop()
+            condition = values.pop()
+            values[-1] = If(values[-1], condition, no)
 
+    def parse(self):
+        lexer = self.lexer
+        values = []
+        ops = []
+        operand = True
+
+        while True:
+            tok, value = lexer.next()
+
+            if operand:
+                if tok in _primary:
+                    values.append(_primary[tok](value))
+                    operand = False
+                elif tok == Token.LeftParentheses:
+                    ops.append((_Group, lexer.start))
+                elif tok in _unary and not (ops and ops[-1][0] == _Unary):
+                    ops.append((_Unary, _unary[tok]))
+                elif tok == Token.Eof:
+                    raise self.__error('expected a expression grammar')
+                else:
+                    raise self.__error('undefined grammar: %s' % str(value))
+                continue
+
+            # postfix operators bind tightest and apply to the operand at hand
+            if tok == Token.LeftParentheses:
+                if lexer.peek()[0] == Token.RightParentheses:
+                    lexer.next()
+                    values[-1] = FunctionCall(values[-1], [])
+                else:
+                    ops.append((_Call, lexer.start, len(values)))
+                    operand = True
+                continue
             elif tok == Token.LeftBracket:
-                self.lexer.next()
-                ast = Subscript(ast, self.parse())
-                if self.lexer.peek()[0] != Token.RightBracket:
-                    raise GrammarError('expected "]"')
-                self.lexer.next()
-
+                ops.append((_Subscript, lexer.start))
+                operand = True
+                continue
             elif tok == Token.Dot:
-                self.lexer.next()
-                tok, value = self.lexer.next()
+                tok, value = lexer.next()
                 if tok != Token.Identifier:
-                    raise GrammarError('expected identifier')
-                ast = Member(ast, value)
-
-            tok, _ = self.lexer.peek()
-
-        return ast
-
-    def __parse_primary_expression(self):
-        tok, value = self.lexer.peek()
-
-        if tok == Token.IntegerConstant:
-            ast = IntegerConstant(value)
-        elif tok == Token.DecimalConstant:
-            ast = DecimalConstant(value)
-        elif tok == Token.StringConstant:
-            ast = StringConstant(value)
-        elif tok == Token.TrueConstant:
-            ast = BoolConstant(value)
-        elif tok == Token.FalseConstant:
-            ast = BoolConstant(value)
-        elif tok == Token.NilConstant:
-            ast = NilConstant(value)
-        elif tok == Token.Identifier:
-            ast = Symbol(value)
-        elif tok == Token.LeftParentheses:
-            self.lexer.next()
-            ast = self.parse()
-            if self.lexer.peek()[0] != Token.RightParentheses:
-                raise GrammarError('expected ")"')
-        else:
-            raise GrammarError(('undefined grammar: %s' % str(value))
-                               if tok != Token.Eof else 'expected a expression grammar')
-
-        self.lexer.next()
-        return ast
-
-    def parse(self):
-        return self.__parse_if_expression()
+                    raise self.__error('expected identifier')
+                values[-1] = Member(values[-1], value)
+                continue
+
+            if ops and ops[-1][0] == _Unary:
+                node = ops.pop()[1]
+                if node is not None:
+                    values[-1] = node(values[-1])
+
+            if tok in _binary:
+                power, node = _binary[tok]
+                while ops and ops[-1][0] == _Binary and ops[-1][1] >= power:
+                    _, _, reduce = ops.pop()
+                    rhs = values.pop()
+                    values[-1] = reduce(values[-1], rhs)
+                ops.append((_Binary, power, node))
+                operand = True
+
+            elif tok == Token.If:
+                self.__reduce_binary(values, ops)
+                ops.append((_If, lexer.start))
+                operand = True
+
+            elif tok == Token.Else:
+                self.__reduce(values, ops)
+                if not ops or ops[-1][0] != _If:
+                    raise self.__error('unexpected "else"')
+                ops[-1] = (_Else,)
+                operand = True
+
+            elif tok == Token.RightParentheses:
+                self.__reduce(values, ops)
+                if ops and ops[-1][0] == _Group:
+                    ops.pop()
+                elif ops and ops[-1][0] == _Call:
+                    _, _, base = ops.pop()
+                    args = values[base:]
+                    del values[base:]
+                    values[-1] = FunctionCall(values[-1], args)
+                else:
+                    raise self.__unclosed(ops, 'unexpected ")"')
+
+            elif tok == Token.RightBracket:
+                self.__reduce(values, ops)
+                if not ops or ops[-1][0] != _Subscript:
+                    raise self.__unclosed(ops, 'unexpected "]"')
+                ops.pop()
+                subscript = values.pop()
+                values[-1] = Subscript(values[-1], subscript)
+
+            elif tok == Token.Comma:
+                self.__reduce(values, ops)
+                if not ops or ops[-1][0] != _Call:
+                    raise self.__unclosed(ops, 'unexpected ","')
+                operand = True
+
+            elif tok == Token.Eof:
+                self.__reduce(values, ops)
+                if ops:
+                    raise self.__unclosed(ops, 'unexpected end of input')
+                return values[0]
+
+            else:
+                raise self.__error('undefined grammar: %s' % str(value))
+
+    def __unclosed(self, ops, message):
+        if ops:
+            kind = ops[-1][0]
+            if kind == _Group or kind == _Call:
+                return self.__error('expected ")"')
+            elif kind == _Subscript:
+                return self.__error('expected "]"')
+            elif kind == _If:
+                return self.__error('excepted "else"')
+        return self.__error(message)
 
 
 def __test():
     while True:
         text = input()
         parser = Parser(Lexer(text))
-        print(repr(parser.parse().eval(None)))
\ No newline at end of file
+        print(repr(parser.parse().eval(None)))
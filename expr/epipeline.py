@@ -0,0 +1,98 @@
+# coding=utf-8
+# author=veficos
+
+import csv
+import decimal
+import json
+import re
+
+from .east import NilConstant
+from .ecache import default_cache
+from .executor import Environment
+
+
+_integer = re.compile(r'-?[0-9]+$')
+_decimal = re.compile(r'-?[0-9]+\.[0-9]+$')
+
+
+def coerce(value):
+    """CSV cells arrive as text; numbers become int or Decimal like expr literals."""
+    if _integer.match(value):
+        return int(value)
+    elif _decimal.match(value):
+        return decimal.Decimal(value)
+    elif value == 'true':
+        return True
+    elif value == 'false':
+        return False
+    return value
+
+
+def read_jsonl(stream):
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield json.loads(line, parse_float=decimal.Decimal)
+
+
+def read_csv(stream, raw=False):
+    for row in csv.DictReader(stream):
+        yield row if raw else {k: coerce(v) for k, v in row.items()}
+
+
+class Pipeline(object):
+    def __init__(self, columns=None, where=None, cache=None):
+        cache = cache if cache is not None else default_cache
+        self.columns = [(name, cache.compile(text)) for name, text in (columns or [])]
+        self.where = [cache.compile(text) for text in (where or [])]
+        self.records = 0
+        self.matched = 0
+        self.errors = 0
+
+    def __eval(self, function, env):
+        try:
+            value = function(env)
+        except Exception:
+            self.errors += 1
+            return None
+        return None if isinstance(value, NilConstant) else value
+
+    def run(self, records):
+        env = Environment()
+        for record in records:
+            self.records += 1
+            env.objects = record
+            env.clear_memo()
+
+            if not all(self.__eval(x, env) for x in self.where):
+                continue
+            self.matched += 1
+
+            if self.columns:
+                record = dict(record)
+                for name, function in self.columns:
+                    record[name] = self.__eval(function, env)
+            yield record
+
+
+def _plain(value):
+    if isinstance(value, decimal.Decimal):
+        return int(value) if value == value.to_integral_value() and value.as_tuple().exponent >= 0 else float(value)
+    if isinstance(value, NilConstant):
+        return None
+    raise TypeError('%r is not JSON serializable' % value)
+
+
+def write_jsonl(records, stream):
+    for record in records:
+        stream.write(json.dumps(record, default=_plain, ensure_ascii=False))
+        stream.write('\n')
+
+
+def write_csv(records, stream):
+    writer = None
+    for record in records:
+        if writer is None:
+            writer = csv.DictWriter(stream, fieldnames=list(record.keys()), extrasaction='ignore')
+            writer.writeheader()
+        writer.writerow({k: '' if v is None else v for k, v in record.items()})
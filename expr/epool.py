@@ -0,0 +1,97 @@
+# coding=utf-8
+# author=veficos
+
+import collections
+import itertools
+import multiprocessing
+import os
+
+from .ecache import default_cache
+from .ecompiler import compile_ast
+from .eartifact import encode, decode
+from .executor import Environment
+
+
+class EvaluationError(Exception):
+    def __init__(self, text, error):
+        super(EvaluationError, self).__init__(text, error)
+        self.text = text
+        self.error = error
+
+    def __repr__(self):
+        return '(EvaluationError: %s: %s)' % (self.text, self.error)
+
+    __str__ = __repr__
+
+
+_texts = None
+_functions = None
+_objects = None
+
+
+def _setup(texts, blobs, objects):
+    # pool initializer only: each worker process holds its own programs
+    global _texts, _functions, _objects
+    _texts = texts
+    _functions = [compile_ast(decode(x)) for x in blobs]
+    _objects = objects
+
+
+def _evaluate(texts, functions, objects, record):
+    env = Environment()
+    if objects:
+        env.objects.update(objects)
+    env.objects.update(record)
+
+    results = []
+    for text, function in zip(texts, functions):
+        try:
+            results.append(function(env))
+        except Exception as e:
+            results.append(EvaluationError(text, '%s: %s' % (type(e).__name__, e)))
+    return results
+
+
+def _evaluate_chunk(records):
+    return [_evaluate(_texts, _functions, _objects, x) for x in records]
+
+
+def _chunks(records, size):
+    records = iter(records)
+    while True:
+        chunk = list(itertools.islice(records, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def evaluate_many(expressions, records, workers=None, chunksize=1024, objects=None, cache=None):
+    """
+    Evaluate every expression against every record (a dict of name -> value)
+    and yield one list of results per record, in input order. A failing
+    expression yields an EvaluationError in its slot instead of a value.
+    objects are extra bindings shared by all records and must be picklable.
+    At most two chunks per worker are in flight, so records are read from
+    the input only as fast as results are consumed.
+    """
+    cache = cache if cache is not None else default_cache
+    texts = list(expressions)
+    blobs = [bytes(encode(cache.parse(x))) for x in texts]
+
+    if workers is not None and workers <= 1:
+        functions = [cache.compile(x) for x in texts]
+        for record in records:
+            yield _evaluate(texts, functions, objects, record)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    with multiprocessing.Pool(workers, initializer=_setup, initargs=(texts, blobs, objects)) as pool:
+        pending = collections.deque()
+        for chunk in _chunks(records, chunksize):
+            pending.append(pool.apply_async(_evaluate_chunk, (chunk,)))
+            if len(pending) >= 2 * workers:
+                for result in pending.popleft().get():
+                    yield result
+        while pending:
+            for result in pending.popleft().get():
+                yield result
@@ -0,0 +1,187 @@
+# coding=utf-8
+# author=veficos
+
+import threading
+import time
+
+from .east import *
+from .ecompiler import _member, _subscript, _call
+
+
+def _label(node):
+    kind = type(node).__name__
+    if type(node) is Symbol:
+        return '%s %s' % (kind, str(node))
+    elif isinstance(node, Constant):
+        return '%s %r' % (kind, node.value)
+    elif type(node) is Member:
+        return '%s .%s' % (kind, node.member)
+    elif type(node) is FunctionCall:
+        return '%s/%d' % (kind, len(node.args))
+    return kind
+
+
+class NodeStats(object):
+    __slots__ = ('node', 'children', 'calls', 'total', 'skipped', 'errors')
+
+    def __init__(self, node, children):
+        self.node = node
+        self.children = children
+        self.calls = 0
+        self.total = 0.0
+        self.skipped = 0
+        self.errors = 0
+
+    @property
+    def self_time(self):
+        return max(self.total - sum(x.total for x in self.children), 0.0)
+
+    def as_dict(self):
+        return {
+            'node': _label(self.node),
+            'calls': self.calls,
+            'total': self.total,
+            'self': self.self_time,
+            'skipped': self.skipped,
+            'errors': self.errors,
+            'children': [x.as_dict() for x in self.children],
+        }
+
+    def lines(self, depth=0):
+        line = '%s%s  (calls=%d total=%.3fms self=%.3fms' % (
+            '  ' * depth, _label(self.node), self.calls, self.total * 1000, self.self_time * 1000)
+        if self.skipped:
+            line += ' skipped=%d' % self.skipped
+        if self.errors:
+            line += ' errors=%d' % self.errors
+        yield line + ')'
+        for x in self.children:
+            for y in x.lines(depth + 1):
+                yield y
+
+
+class _CountingEnvironment(object):
+    def __init__(self, env, lookups):
+        self.env = env
+        self.lookups = lookups
+        self.memos = getattr(env, 'memos', None)
+
+    def get_object(self, name):
+        self.lookups[name] = self.lookups.get(name, 0) + 1
+        return self.env.get_object(name)
+
+
+class _Profile(object):
+    def __init__(self, text, ast, clock):
+        self.text = text
+        self.clock = clock
+        self.runs = 0
+        self.lookups = {}
+        self.root, self.function = self.__build(ast)
+
+    def __build(self, node):
+        built = [self.__build(x) for x in children(node)]
+        stats = NodeStats(node, [x[0] for x in built])
+        subs = [x[1] for x in built]
+        kind = type(node)
+
+        if isinstance(node, Constant):
+            value = node.eval(None)
+            compute = lambda env: value
+        elif kind is Symbol:
+            name = str(node)
+            compute = lambda env: env.get_object(name)
+        elif kind is Member:
+            obj, = subs
+            member = node.member
+            compute = lambda env: _member(obj(env), member)
+        elif kind is Subscript:
+            obj, subscript = subs
+            compute = lambda env: _subscript(obj(env), subscript(env))
+        elif kind is FunctionCall:
+            callee, args = subs[0], subs[1:]
+            compute = lambda env: _call(env, callee(env), *[x(env) for x in args])
+        elif kind is Negative:
+            value, = subs
+            compute = lambda env: - value(env)
+        elif kind is Not:
+            value, = subs
+            compute = lambda env: not value(env)
+        elif kind is LogicalAnd or kind is LogicalOr:
+            lhs, rhs = subs
+            skipped = stats.children[1]
+            is_and = kind is LogicalAnd
+
+            def compute(env):
+                value = lhs(env)
+                if bool(value) != is_and:
+                    skipped.skipped += 1
+                    return value
+                return rhs(env)
+        elif kind is If:
+            yes, condition, no = subs
+            yes_stats, _, no_stats = stats.children
+
+            def compute(env):
+                if condition(env):
+                    no_stats.skipped += 1
+                    return yes(env)
+                yes_stats.skipped += 1
+                return no(env)
+        else:
+            lhs, rhs = subs
+            op = binary_operators[kind]
+            compute = lambda env: op(lhs(env), rhs(env))
+
+        clock = self.clock
+
+        def run(env):
+            stats.calls += 1
+            start = clock()
+            try:
+                return compute(env)
+            except Exception:
+                stats.errors += 1
+                raise
+            finally:
+                stats.total += clock() - start
+        return stats, run
+
+    def report(self):
+        lines = ['%s  (runs=%d)' % (self.text, self.runs)]
+        lines.extend(self.root.lines(1))
+        if self.lookups:
+            lines.append('  lookups: %s' % ', '.join('%s=%d' % x for x in sorted(self.lookups.items())))
+        return '\n'.join(lines)
+
+    def as_dict(self):
+        return {'text': self.text, 'runs': self.runs, 'lookups': dict(self.lookups), 'tree': self.root.as_dict()}
+
+
+class Profiler(object):
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.profiles = {}
+
+    def run(self, text, ast, env):
+        profile = self.profiles.get(text, None)
+        if profile is None:
+            with self.lock:
+                profile = self.profiles.setdefault(text, _Profile(text, ast, self.clock))
+        profile.runs += 1
+        return profile.function(_CountingEnvironment(env, profile.lookups))
+
+    def report(self, text=None):
+        profiles = [self.profiles[text]] if text is not None else list(self.profiles.values())
+        return '\n\n'.join(x.report() for x in profiles)
+
+    def as_dict(self):
+        return {text: x.as_dict() for text, x in self.profiles.items()}
+
+    def reset(self):
+        with self.lock:
+            self.profiles.clear()
+
+    def __repr__(self):
+        return '(Profiler: %d expressions)' % len(self.profiles)
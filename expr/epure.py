@@ -0,0 +1,137 @@
+# coding=utf-8
+# author=veficos
+
+import threading
+import time
+from collections import OrderedDict
+
+
+_missing = object()
+
+
+class _Memo(object):
+    def __init__(self, maxsize, ttl, clock):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        """Returns (value, status) where status is 'hit', 'miss' or 'expired'."""
+        entry = self.entries.get(key, None)
+        if entry is None:
+            return _missing, 'miss'
+        value, expires = entry
+        if expires is not None and expires <= self.clock():
+            del self.entries[key]
+            return _missing, 'expired'
+        self.entries.move_to_end(key)
+        return value, 'hit'
+
+    def put(self, key, value):
+        self.entries[key] = (value, None if self.ttl is None else self.clock() + self.ttl)
+        self.entries.move_to_end(key)
+        evicted = 0
+        while len(self.entries) > max(self.maxsize, 0):
+            self.entries.popitem(last=False)
+            evicted += 1
+        return evicted
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class PureFunction(object):
+    Global = 'global'
+    Evaluation = 'evaluation'
+
+    def __init__(self, function, scope=Global, maxsize=1024, ttl=None, clock=time.monotonic):
+        if scope not in (PureFunction.Global, PureFunction.Evaluation):
+            raise ValueError('unknown memoization scope: %s' % scope)
+
+        self.function = function
+        self.scope = scope
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.memo = _Memo(maxsize, ttl, clock)
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.uncacheable = 0
+
+    def __call__(self, *args):
+        if self.scope == PureFunction.Global:
+            return self.__lookup(self.memo, args)
+        return self.function(*args)
+
+    def call(self, env, args):
+        if self.scope == PureFunction.Global:
+            return self.__lookup(self.memo, args)
+
+        memos = getattr(env, 'memos', None)
+        if memos is None:
+            return self.function(*args)
+        memo = memos.get(self, None)
+        if memo is None:
+            memo = memos.setdefault(self, _Memo(self.maxsize, self.ttl, self.clock))
+        return self.__lookup(memo, args)
+
+    def __lookup(self, memo, args):
+        # typed like lru_cache(typed=True): 1, 1.0, True and Decimal(1) are equal
+        key = tuple((type(x), x) for x in args)
+        try:
+            hash(key)
+        except TypeError:
+            with self.lock:
+                self.uncacheable += 1
+            return self.function(*args)
+
+        with self.lock:
+            value, status = memo.get(key)
+            if status == 'hit':
+                self.hits += 1
+                return value
+            self.misses += 1
+            if status == 'expired':
+                self.expired += 1
+
+        value = self.function(*args)
+
+        with self.lock:
+            self.evictions += memo.put(key, value)
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.memo = _Memo(self.maxsize, self.ttl, self.clock)
+            self.hits = 0
+            self.misses = 0
+            self.expired = 0
+            self.evictions = 0
+            self.uncacheable = 0
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'scope': self.scope,
+                'hits': self.hits,
+                'misses': self.misses,
+                'expired': self.expired,
+                'evictions': self.evictions,
+                'uncacheable': self.uncacheable,
+                'size': len(self.memo),
+                'hit_rate': float(self.hits) / lookups if lookups else 0.0,
+            }
+
+    def __repr__(self):
+        return '(PureFunction: %s %s)' % (getattr(self.function, '__name__', repr(self.function)), self.scope)
+
+
+def pure(function=None, **kwargs):
+    if function is None:
+        return lambda function: PureFunction(function, **kwargs)
+    return PureFunction(function, **kwargs)
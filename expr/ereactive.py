@@ -0,0 +1,188 @@
+# coding=utf-8
+# author=veficos
+
+from .east import *
+from .ecache import default_cache
+from .ecompiler import _member, _subscript
+
+
+_missing = object()
+
+
+def _path(node):
+    if type(node) is Symbol:
+        return (str(node),)
+    elif type(node) is Member:
+        path = _path(node.obj)
+        if path is not None:
+            return path + (node.member,)
+    return None
+
+
+def _overlaps(a, b):
+    size = min(len(a), len(b))
+    return a[:size] == b[:size]
+
+
+def _split(path):
+    return tuple(path.split('.')) if isinstance(path, str) else tuple(path)
+
+
+class _Expression(object):
+    def __init__(self, name, text, ast):
+        self.name = name
+        self.text = text
+        self.ast = ast
+        self.paths = set()
+        self.slots = []
+        self.cache = {}
+        self.value = _missing
+        self.dirty = True
+        self.function = self.__build(ast, self.paths)
+
+    def __build(self, node, paths):
+        path = _path(node)
+        if path is not None:
+            paths.add(path)
+            if type(node) is Symbol:
+                name = str(node)
+                return lambda env: env.get_object(name)
+            obj = self.__build(node.obj, set())
+            member = node.member
+            return lambda env: _member(obj(env), member)
+
+        kind = type(node)
+        own = set()
+        subs = [self.__build(x, own) for x in children(node)]
+        paths.update(own)
+
+        if isinstance(node, Constant):
+            value = node.eval(None)
+            return lambda env: value
+        elif kind is Member:
+            obj, = subs
+            member = node.member
+            compute = lambda env: _member(obj(env), member)
+        elif kind is Subscript:
+            obj, subscript = subs
+            compute = lambda env: _subscript(obj(env), subscript(env))
+        elif kind is FunctionCall:
+            callee, args = subs[0], subs[1:]
+            # calls may be impure, so they are re-run whenever the expression is
+            return lambda env: callee(env)(*[x(env) for x in args])
+        elif kind is Negative:
+            value, = subs
+            compute = lambda env: - value(env)
+        elif kind is Not:
+            value, = subs
+            compute = lambda env: not value(env)
+        elif kind is LogicalAnd:
+            lhs, rhs = subs
+            compute = lambda env: lhs(env) and rhs(env)
+        elif kind is LogicalOr:
+            lhs, rhs = subs
+            compute = lambda env: lhs(env) or rhs(env)
+        elif kind is If:
+            yes, condition, no = subs
+            compute = lambda env: yes(env) if condition(env) else no(env)
+        else:
+            lhs, rhs = subs
+            op = binary_operators[kind]
+            compute = lambda env: op(lhs(env), rhs(env))
+
+        if any(type(x) is FunctionCall for x in _walk(node)):
+            return compute
+
+        slot = len(self.slots)
+        self.slots.append(own)
+        cache = self.cache
+
+        def cached(env):
+            value = cache.get(slot, _missing)
+            if value is _missing:
+                value = cache[slot] = compute(env)
+            return value
+        return cached
+
+    def invalidate(self, path):
+        if not any(_overlaps(path, x) for x in self.paths):
+            return False
+        for slot, paths in enumerate(self.slots):
+            if slot in self.cache and any(_overlaps(path, x) for x in paths):
+                del self.cache[slot]
+        self.dirty = True
+        return True
+
+
+def _walk(node):
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(children(node))
+
+
+class Reactive(object):
+    def __init__(self, env, cache=None):
+        self.env = env
+        self.cache = cache if cache is not None else default_cache
+        self.expressions = {}
+        self.subscribers = []
+        self.env.observe(self.invalidate)
+
+    def register(self, name, text):
+        self.expressions[name] = _Expression(name, text, self.cache.parse(text))
+
+    def unregister(self, name):
+        self.expressions.pop(name)
+        self.subscribers = [x for x in self.subscribers if x[0] != name]
+
+    def dependencies(self, name):
+        return sorted('.'.join(x) for x in self.expressions[name].paths)
+
+    def subscribe(self, callback, name=None):
+        self.subscribers.append((name, callback))
+
+    def unsubscribe(self, callback):
+        self.subscribers = [x for x in self.subscribers if x[1] is not callback]
+
+    def invalidate(self, path):
+        path = _split(path)
+        return [x.name for x in self.expressions.values() if x.invalidate(path)]
+
+    def dirty(self):
+        return [x.name for x in self.expressions.values() if x.dirty]
+
+    def recompute(self):
+        changed = {}
+        for expression in self.expressions.values():
+            if not expression.dirty:
+                continue
+            expression.dirty = False
+
+            try:
+                value = expression.function(self.env)
+            except Exception as e:
+                print("eval error: ", expression.text, e)
+                value = None
+
+            old = expression.value
+            expression.value = value
+            if old is _missing or old != value or type(old) is not type(value):
+                changed[expression.name] = value
+                for name, callback in self.subscribers:
+                    if name is None or name == expression.name:
+                        callback(expression.name, None if old is _missing else old, value)
+        return changed
+
+    def get(self, name):
+        expression = self.expressions[name]
+        if expression.dirty:
+            self.recompute()
+        return expression.value
+
+    def close(self):
+        self.env.unobserve(self.invalidate)
+
+    def __repr__(self):
+        return '(Reactive: %d expressions, %d dirty)' % (len(self.expressions), len(self.dirty()))
@@ -0,0 +1,161 @@
+# coding=utf-8
+# author=veficos
+
+from .east import *
+from .ecache import default_cache
+from .ecompiler import _member, _subscript, _call
+from .eoptimizer import count_nodes
+from .edepend import union
+
+
+_missing = object()
+
+
+def structural_key(node, keys=None):
+    """Key that is equal for structurally identical subtrees."""
+    if keys is None:
+        keys = {}
+    key = keys.get(id(node), None)
+    if key is not None:
+        return key
+
+    kind = type(node)
+    if kind is Symbol:
+        key = (kind, str(node))
+    elif isinstance(node, Constant):
+        key = (kind, type(node.value), repr(node.value))
+    elif kind is Member:
+        key = (kind, structural_key(node.obj, keys), node.member)
+    else:
+        key = (kind,) + tuple(structural_key(x, keys) for x in children(node))
+
+    keys[id(node)] = key
+    return key
+
+
+class RuleSet(object):
+    def __init__(self, rules, cache=None):
+        self.cache = cache if cache is not None else default_cache
+
+        if isinstance(rules, dict):
+            self.names = list(rules.keys())
+            texts = list(rules.values())
+        else:
+            texts = list(rules)
+            self.names = None
+
+        self.texts = texts
+        self.asts = [self.cache.parse(x) for x in texts]
+
+        self.total_nodes = sum(count_nodes(x) for x in self.asts)
+        self.keys = {}
+        self.nodes = {}
+        self.uses = {}
+        self.roots = [self.__intern(x) for x in self.asts]
+
+        self.slots = 0
+        self.functions = {}
+        self.rules = [self.__build(x) for x in self.roots]
+
+    def __intern(self, node):
+        key = structural_key(node, self.keys)
+        self.uses[key] = self.uses.get(key, 0) + 1
+        if key in self.nodes:
+            return key
+        for child in children(node):
+            self.__intern(child)
+        self.nodes[key] = node
+        return key
+
+    def __build(self, key):
+        function = self.functions.get(key, None)
+        if function is not None:
+            return function
+
+        node = self.nodes[key]
+        kind = type(node)
+        subs = [self.__build(structural_key(x, self.keys)) for x in children(node)]
+
+        if isinstance(node, Constant):
+            value = node.eval(None)
+            compute = lambda env, memo: value
+        elif kind is Symbol:
+            name = str(node)
+            compute = lambda env, memo: env.get_object(name)
+        elif kind is Member:
+            obj, = subs
+            member = node.member
+            compute = lambda env, memo: _member(obj(env, memo), member)
+        elif kind is Subscript:
+            obj, subscript = subs
+            compute = lambda env, memo: _subscript(obj(env, memo), subscript(env, memo))
+        elif kind is FunctionCall:
+            callee, args = subs[0], subs[1:]
+            compute = lambda env, memo: _call(env, callee(env, memo), *[x(env, memo) for x in args])
+        elif kind is Negative:
+            value, = subs
+            compute = lambda env, memo: - value(env, memo)
+        elif kind is Not:
+            value, = subs
+            compute = lambda env, memo: not value(env, memo)
+        elif kind is LogicalAnd:
+            lhs, rhs = subs
+            compute = lambda env, memo: lhs(env, memo) and rhs(env, memo)
+        elif kind is LogicalOr:
+            lhs, rhs = subs
+            compute = lambda env, memo: lhs(env, memo) or rhs(env, memo)
+        elif kind is If:
+            yes, condition, no = subs
+            compute = lambda env, memo: yes(env, memo) if condition(env, memo) else no(env, memo)
+        else:
+            lhs, rhs = subs
+            op = binary_operators[kind]
+            compute = lambda env, memo: op(lhs(env, memo), rhs(env, memo))
+
+        if self.uses[key] > 1 and not isinstance(node, Constant):
+            slot = self.slots
+            self.slots += 1
+
+            def shared(env, memo):
+                value = memo[slot]
+                if value is _missing:
+                    value = memo[slot] = compute(env, memo)
+                return value
+            function = shared
+        else:
+            function = compute
+
+        self.functions[key] = function
+        return function
+
+    def eval(self, env):
+        memo = [_missing] * self.slots
+        results = []
+        for text, rule in zip(self.texts, self.rules):
+            try:
+                results.append(rule(env, memo))
+            except Exception as e:
+                print("eval error: ", text, e)
+                results.append(None)
+
+        if self.names is not None:
+            return dict(zip(self.names, results))
+        return results
+
+    def dependencies(self):
+        return union(self.asts)
+
+    def stats(self):
+        return {
+            'rules': len(self.rules),
+            'nodes': self.total_nodes,
+            'unique': len(self.nodes),
+            'deduplicated': self.total_nodes - len(self.nodes),
+            'shared': self.slots,
+        }
+
+    def __len__(self):
+        return len(self.rules)
+
+    def __repr__(self):
+        return '(RuleSet: %s)' % str(self.stats())
@@ -0,0 +1,92 @@
+# coding=utf-8
+# author=veficos
+
+from types import MappingProxyType
+
+from .executor import Environment
+from .ecache import default_cache
+from .ecompiler import compile_ast
+
+
+_missing = object()
+
+
+class ScopeError(Exception):
+    pass
+
+
+class Scope(Environment):
+    """
+    An Environment that falls back to a parent scope for names it does not
+    bind itself. A frozen scope is read-only and can be shared between
+    threads; child() gives each request a cheap scope on top of it.
+    """
+
+    def __init__(self, objects=None, parent=None):
+        super(Scope, self).__init__()
+        if objects:
+            self.objects.update(objects)
+        self.parent = parent
+        self.frozen = False
+
+    def push_object(self, name, value):
+        if self.frozen:
+            raise ScopeError('cannot push "%s" into a frozen scope' % name)
+        super(Scope, self).push_object(name, value)
+
+    def pop_object(self, name):
+        if self.frozen:
+            raise ScopeError('cannot pop "%s" from a frozen scope' % name)
+        super(Scope, self).pop_object(name)
+
+    def get_object(self, name):
+        scope = self
+        while scope is not None:
+            value = scope.objects.get(name, _missing)
+            if value is not _missing:
+                return value
+            scope = scope.parent
+        return None
+
+    def freeze(self):
+        if not self.frozen:
+            self.objects = MappingProxyType(dict(self.objects))
+            self.frozen = True
+        return self
+
+    def child(self, objects=None):
+        if not self.frozen:
+            raise ScopeError('only a frozen scope can have children')
+        return Scope(objects, self)
+
+    def frozen_bindings(self):
+        """Names whose values are fixed by this scope's frozen ancestors."""
+        chain = []
+        scope = self
+        while scope is not None:
+            if scope.frozen:
+                chain.append(scope)
+            scope = scope.parent
+        bindings = {}
+        for scope in reversed(chain):
+            bindings.update(scope.objects)
+        return bindings
+
+    def compile(self, text, fixed=(), cache=None):
+        """
+        Compile text for children of this scope. Names listed in fixed must
+        be bound by frozen scopes; their values are resolved now and baked
+        into the function, so children cannot shadow them. Every other name
+        is looked up per request.
+        """
+        cache = cache if cache is not None else default_cache
+        frozen = self.frozen_bindings()
+        bindings = {}
+        for name in fixed:
+            if name not in frozen:
+                raise ScopeError('"%s" is not bound by a frozen scope' % name)
+            bindings[name] = frozen[name]
+        return compile_ast(cache.parse(text), bindings)
+
+    def __repr__(self):
+        return '(Scope: %s%s)' % (str(dict(self.objects)), ' frozen' if self.frozen else '')
@@ -0,0 +1,167 @@
+# coding=utf-8
+# author=veficos
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .east import *
+
+
+class VectorError(Exception):
+    pass
+
+
+class _RowEnvironment(object):
+    def __init__(self, env, index):
+        self.env = env
+        self.index = index
+
+    def get_object(self, name):
+        value = self.env.get_object(name)
+        if isinstance(value, np.ndarray) and value.ndim > 0:
+            return value[self.index]
+        return value
+
+
+def _is_vector(value):
+    return isinstance(value, np.ndarray) and value.ndim > 0
+
+
+def _truth(value):
+    return np.asarray(value).astype(bool)
+
+
+def _narrow(mask, selected):
+    return selected if mask is None else mask & selected
+
+
+class VectorEvaluator(object):
+    def __init__(self, ast):
+        if np is None:
+            raise VectorError('vector evaluation requires numpy')
+
+        self.ast = ast
+        self.fallbacks = 0
+
+        self.ufuncs = {
+            Multiply: np.multiply,
+            Divide: np.true_divide,
+            IntegerDivide: np.mod,
+            Add: np.add,
+            Subtract: np.subtract,
+            LessOrEqual: np.less_equal,
+            GreaterOrEqual: np.greater_equal,
+            LessThan: np.less,
+            GreaterThan: np.greater,
+            Equal: np.equal,
+            UnEqual: np.not_equal,
+        }
+
+    def eval(self, env):
+        size = self.__size(env)
+        result = self.__eval(self.ast, env, size)
+        if not _is_vector(result):
+            result = np.full(1 if size is None else size, result)
+        return result
+
+    def __size(self, env):
+        sizes = set(len(x) for x in getattr(env, 'objects', {}).values() if _is_vector(x))
+        if len(sizes) > 1:
+            raise VectorError('columns have different lengths: %s' % sorted(sizes))
+        return sizes.pop() if sizes else None
+
+    def __rows(self, node, env, size, mask=None):
+        # mask limits the fallback to the rows short-circuiting would reach
+        self.fallbacks += 1
+        if size is None:
+            return node.eval(env)
+        if mask is None:
+            return np.array([node.eval(_RowEnvironment(env, i)) for i in range(size)])
+
+        rows = np.flatnonzero(mask)
+        if not len(rows):
+            return None
+        values = [node.eval(_RowEnvironment(env, i)) for i in rows]
+        # skipped rows repeat a computed value so the column keeps its dtype
+        column = [values[0]] * size
+        for i, value in zip(rows, values):
+            column[i] = value
+        return np.array(column)
+
+    def __eval(self, node, env, size, mask=None):
+        kind = type(node)
+
+        if kind is DecimalConstant:
+            return float(node.value)
+
+        elif isinstance(node, Constant):
+            return node.eval(env)
+
+        elif kind is Symbol:
+            return node.eval(env)
+
+        elif kind in self.ufuncs:
+            lhs = self.__eval(node.lhs, env, size, mask)
+            rhs = self.__eval(node.rhs, env, size, mask)
+            if not _is_vector(lhs) and not _is_vector(rhs):
+                return binary_operators[kind](lhs, rhs)
+            try:
+                return self.ufuncs[kind](lhs, rhs)
+            except (TypeError, ValueError):
+                return self.__rows(node, env, size, mask)
+
+        elif kind is Negative:
+            value = self.__eval(node.value, env, size, mask)
+            if not _is_vector(value):
+                return - value
+            try:
+                return np.negative(value)
+            except (TypeError, ValueError):
+                return self.__rows(node, env, size, mask)
+
+        elif kind is Not:
+            value = self.__eval(node.value, env, size, mask)
+            if not _is_vector(value):
+                return not value
+            try:
+                return np.logical_not(_truth(value))
+            except (TypeError, ValueError):
+                return self.__rows(node, env, size, mask)
+
+        elif kind is LogicalAnd or kind is LogicalOr:
+            lhs = self.__eval(node.lhs, env, size, mask)
+            if not _is_vector(lhs):
+                if kind is LogicalAnd:
+                    return self.__eval(node.rhs, env, size, mask) if lhs else lhs
+                return lhs if lhs else self.__eval(node.rhs, env, size, mask)
+
+            selected = _truth(lhs) if kind is LogicalAnd else ~_truth(lhs)
+            rhs = self.__eval(node.rhs, env, size, _narrow(mask, selected))
+            try:
+                if lhs.dtype == bool and np.asarray(rhs).dtype == bool:
+                    return np.logical_and(lhs, rhs) if kind is LogicalAnd else np.logical_or(lhs, rhs)
+                truth = _truth(lhs)
+                return np.where(truth, rhs, lhs) if kind is LogicalAnd else np.where(truth, lhs, rhs)
+            except (TypeError, ValueError):
+                return self.__rows(node, env, size, mask)
+
+        elif kind is If:
+            condition = self.__eval(node.condition, env, size, mask)
+            if not _is_vector(condition):
+                return self.__eval(node.yes if condition else node.no, env, size, mask)
+            selected = _truth(condition)
+            yes = self.__eval(node.yes, env, size, _narrow(mask, selected))
+            no = self.__eval(node.no, env, size, _narrow(mask, ~selected))
+            try:
+                return np.where(selected, yes, no)
+            except (TypeError, ValueError):
+                return self.__rows(node, env, size, mask)
+
+        # member, subscript and function call nodes have no array form
+        return self.__rows(node, env, size, mask)
+
+
+def vectorize(ast):
+    return VectorEvaluator(ast)
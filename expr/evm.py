@@ -0,0 +1,249 @@
+# coding=utf-8
+# author=veficos
+
+import operator
+from array import array
+
+from .east import *
+from .ecompiler import _member, _subscript, _call
+
+
+class VMError(Exception):
+    pass
+
+
+class Op:
+    Const = 0
+    Load = 1
+    Member = 2
+    Subscript = 3
+    Call = 4
+    Neg = 5
+    Not = 6
+    Jump = 7
+    JumpIfFalseOrPop = 8
+    JumpIfTrueOrPop = 9
+    PopJumpIfFalse = 10
+    Return = 11
+    Mul = 12
+    Div = 13
+    Mod = 14
+    Add = 15
+    Sub = 16
+    Le = 17
+    Ge = 18
+    Lt = 19
+    Gt = 20
+    Eq = 21
+    Ne = 22
+
+
+_names = {v: k for k, v in vars(Op).items() if not k.startswith('_')}
+
+_jumps = (Op.Jump, Op.JumpIfFalseOrPop, Op.JumpIfTrueOrPop, Op.PopJumpIfFalse)
+
+_binary_ops = {
+    Multiply: Op.Mul,
+    Divide: Op.Div,
+    IntegerDivide: Op.Mod,
+    Add: Op.Add,
+    Subtract: Op.Sub,
+    LessOrEqual: Op.Le,
+    GreaterOrEqual: Op.Ge,
+    LessThan: Op.Lt,
+    GreaterThan: Op.Gt,
+    Equal: Op.Eq,
+    UnEqual: Op.Ne,
+}
+
+_binary_functions = [None] * Op.Mul + [
+    operator.mul,
+    operator.truediv,
+    operator.mod,
+    operator.add,
+    operator.sub,
+    operator.le,
+    operator.ge,
+    operator.lt,
+    operator.gt,
+    operator.eq,
+    operator.ne,
+]
+
+
+class Program(object):
+    def __init__(self, codes, args, constants):
+        self.codes = codes
+        self.args = args
+        self.constants = tuple(constants)
+
+    def run(self, env):
+        codes = self.codes
+        args = self.args
+        constants = self.constants
+        binary = _binary_functions
+        get = env.get_object
+
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        pc = 0
+
+        while True:
+            op = codes[pc]
+            arg = args[pc]
+            pc += 1
+
+            if op >= Op.Mul:
+                rhs = pop()
+                stack[-1] = binary[op](stack[-1], rhs)
+            elif op == Op.Const:
+                push(constants[arg])
+            elif op == Op.Load:
+                push(get(constants[arg]))
+            elif op == Op.Member:
+                stack[-1] = _member(stack[-1], constants[arg])
+            elif op == Op.Subscript:
+                subscript = pop()
+                stack[-1] = _subscript(stack[-1], subscript)
+            elif op == Op.Call:
+                if arg:
+                    values = stack[-arg:]
+                    del stack[-arg:]
+                    stack[-1] = _call(env, stack[-1], *values)
+                else:
+                    stack[-1] = _call(env, stack[-1])
+            elif op == Op.PopJumpIfFalse:
+                if not pop():
+                    pc = arg
+            elif op == Op.JumpIfFalseOrPop:
+                if stack[-1]:
+                    pop()
+                else:
+                    pc = arg
+            elif op == Op.JumpIfTrueOrPop:
+                if stack[-1]:
+                    pc = arg
+                else:
+                    pop()
+            elif op == Op.Jump:
+                pc = arg
+            elif op == Op.Not:
+                stack[-1] = not stack[-1]
+            elif op == Op.Neg:
+                stack[-1] = - stack[-1]
+            elif op == Op.Return:
+                return pop()
+            else:
+                raise VMError('bad opcode %d at %d' % (op, pc - 1))
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __repr__(self):
+        return '(Program: %d instructions, %d constants)' % (len(self.codes), len(self.constants))
+
+
+class _Assembler(object):
+    def __init__(self):
+        self.codes = array('B')
+        self.args = array('i')
+        self.constants = []
+        self.indexes = {}
+
+    def constant(self, value):
+        key = (type(value), repr(value))
+        index = self.indexes.get(key, None)
+        if index is None:
+            index = self.indexes[key] = len(self.constants)
+            self.constants.append(value)
+        return index
+
+    def emit(self, op, arg=0):
+        self.codes.append(op)
+        self.args.append(arg)
+        return len(self.codes) - 1
+
+    def patch(self, at):
+        self.args[at] = len(self.codes)
+
+    def lower(self, node):
+        kind = type(node)
+
+        if isinstance(node, Constant):
+            self.emit(Op.Const, self.constant(node.eval(None)))
+        elif kind is Symbol:
+            self.emit(Op.Load, self.constant(str(node)))
+        elif kind is Member:
+            self.lower(node.obj)
+            self.emit(Op.Member, self.constant(node.member))
+        elif kind is Subscript:
+            self.lower(node.obj)
+            self.lower(node.subscript)
+            self.emit(Op.Subscript)
+        elif kind is FunctionCall:
+            self.lower(node.function)
+            for x in node.args:
+                self.lower(x)
+            self.emit(Op.Call, len(node.args))
+        elif kind is Negative:
+            self.lower(node.value)
+            self.emit(Op.Neg)
+        elif kind is Not:
+            self.lower(node.value)
+            self.emit(Op.Not)
+        elif kind is LogicalAnd or kind is LogicalOr:
+            self.lower(node.lhs)
+            jump = self.emit(Op.JumpIfFalseOrPop if kind is LogicalAnd else Op.JumpIfTrueOrPop)
+            self.lower(node.rhs)
+            self.patch(jump)
+        elif kind is If:
+            self.lower(node.condition)
+            otherwise = self.emit(Op.PopJumpIfFalse)
+            self.lower(node.yes)
+            end = self.emit(Op.Jump)
+            self.patch(otherwise)
+            self.lower(node.no)
+            self.patch(end)
+        elif kind in _binary_ops:
+            self.lower(node.lhs)
+            self.lower(node.rhs)
+            self.emit(_binary_ops[kind])
+        else:
+            raise VMError('unsupported node: %s' % repr(node))
+
+    def thread_jumps(self):
+        # a jump landing on an unconditional jump can go straight to its target
+        for i, op in enumerate(self.codes):
+            if op in _jumps:
+                target = self.args[i]
+                seen = 0
+                while self.codes[target] == Op.Jump and seen < len(self.codes):
+                    target = self.args[target]
+                    seen += 1
+                self.args[i] = target
+
+
+def assemble(ast):
+    assembler = _Assembler()
+    assembler.lower(ast)
+    assembler.emit(Op.Return)
+    assembler.thread_jumps()
+    return Program(assembler.codes, assembler.args, assembler.constants)
+
+
+def disassemble(program):
+    targets = set(program.args[i] for i, op in enumerate(program.codes) if op in _jumps)
+    lines = []
+    for i, (op, arg) in enumerate(zip(program.codes, program.args)):
+        name = _names.get(op, '?')
+        if op in (Op.Const, Op.Load, Op.Member):
+            operand = '%d (%r)' % (arg, program.constants[arg])
+        elif op in _jumps:
+            operand = 'to %d' % arg
+        elif op == Op.Call:
+            operand = str(arg)
+        else:
+            operand = ''
+        lines.append('%s %4d %-18s %s' % ('>>' if i in targets else '  ', i, name, operand))
+    return '\n'.join(x.rstrip() for x in lines)
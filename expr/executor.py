@@ -1,19 +1,46 @@
 # coding=utf-8
 # author=veficos
 
-from .elexer import Lexer
-from .eparser import Parser
+import contextlib
+
+from .ecache import default_cache
+from .edepend import eager_roots
+from .evector import VectorEvaluator
+from .epure import PureFunction
+from .eprofile import Profiler
 
 
 class Environment(object):
     def __init__(self):
         self.objects = {}
+        self.observers = []
+        self.memos = {}
 
     def push_object(self, name, value):
         self.objects.update({name: value})
+        self.clear_memo()
+        self.notify(name)
+
+    def push_pure(self, name, function, **kwargs):
+        self.push_object(name, PureFunction(function, **kwargs))
 
     def pop_object(self, name):
         self.objects.pop(name)
+        self.clear_memo()
+        self.notify(name)
+
+    def clear_memo(self):
+        self.memos.clear()
+
+    def observe(self, callback):
+        self.observers.append(callback)
+
+    def unobserve(self, callback):
+        self.observers.remove(callback)
+
+    def notify(self, name):
+        for callback in self.observers:
+            callback(name)
 
     def get_object(self, name):
         return self.objects.get(name, None)
@@ -23,20 +50,73 @@ class Environment(object):
 
 
 class Executor(object):
-    def __init__(self, text, env):
+    def __init__(self, text, env, cache=None, profiler=None, numeric=None):
         self.text = text
         self.env = env
+        self.cache = cache if cache is not None else default_cache
+        self.profiler = profiler
+        self.numeric = numeric
+        self.roots = None
+
+    def __evaluation(self):
+        # environments with per-evaluation state, such as LazyEnvironment,
+        # get told which root names the expression reads on every run
+        evaluation = getattr(self.env, 'evaluation', None)
+        if evaluation is None:
+            # evaluation-scoped memos live for exactly one run
+            clear_memo = getattr(self.env, 'clear_memo', None)
+            if clear_memo is not None:
+                clear_memo()
+            return contextlib.nullcontext()
+        if self.roots is None:
+            self.roots = sorted(eager_roots(self.cache.parse(self.text)))
+        return evaluation(self.roots)
 
     def exec(self):
         try:
-            ast = Parser(Lexer(self.text)).parse()
-            return ast.eval(self.env)
+            if self.profiler is not None:
+                with self.__evaluation():
+                    return self.profiler.run(self.text, self.cache.parse(self.text), self.env)
+            function = self.cache.compile(self.text, self.numeric)
+            with self.__evaluation():
+                return function(self.env)
+        except Exception as e:
+            print("eval error: ", e)
+
+    def explain(self):
+        profiler = Profiler()
+        try:
+            with self.__evaluation():
+                profiler.run(self.text, self.cache.parse(self.text), self.env)
+        except Exception as e:
+            print("eval error: ", e)
+        return profiler.report(self.text)
+
+    async def aexec(self):
+        try:
+            function = self.cache.compile_async(self.text)
+            with self.__evaluation():
+                return await function(self.env)
+        except Exception as e:
+            print("eval error: ", e)
+
+    def compile(self):
+        try:
+            return self.cache.compile(self.text, self.numeric)
+        except Exception as e:
+            print("compile error: ", e)
+
+    def exec_columns(self):
+        try:
+            evaluator = VectorEvaluator(self.cache.parse(self.text))
+            with self.__evaluation():
+                return evaluator.eval(self.env)
         except Exception as e:
             print("eval error: ", e)
 
     def ast(self):
         try:
-            ast = Parser(Lexer(self.text)).parse()
+            ast = self.cache.parse(self.text)
             return ast
         except Exception as e:
             print("parser error: ", e)
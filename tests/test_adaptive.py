@@ -0,0 +1,46 @@
+# coding=utf-8
+# author=veficos
+
+import unittest
+
+from expr.elexer import Lexer
+from expr.eparser import Parser
+from expr.eadaptive import adapt
+from expr.executor import Environment
+
+
+def parse(text):
+    return Parser(Lexer(text)).parse()
+
+
+class AdaptiveTest(unittest.TestCase):
+    def run_both(self, text, env, rounds=300):
+        ast = parse(text)
+        adaptive = adapt(ast, warmup=8, sample_every=4)
+        for _ in range(rounds):
+            self.assertEqual(adaptive.eval(env), ast.eval(env), text)
+        return adaptive
+
+    def test_side_effecting_calls_are_never_reordered(self):
+        calls = []
+        env = Environment()
+        env.push_object('audit', lambda: calls.append(1) or True)
+        env.push_object('flag', False)
+        env.push_object('b', True)
+        for text in ['flag && (audit() || b)', 'flag && !(audit() || b)',
+                     'flag && ((audit() || b) if b else b)', 'flag && audit()']:
+            adaptive = self.run_both(text, env)
+            self.assertFalse(adaptive.stats()[0]['safe'], text)
+        self.assertEqual(calls, [])
+
+    def test_pure_chain_is_reordered_with_source_results(self):
+        env = Environment()
+        env.push_pure('slow', lambda x: x > 0)
+        for i in range(50):
+            env.push_object('x', i)
+            env.push_object('region', 'eu' if i % 10 == 0 else 'us')
+            self.run_both('slow(x) && region == "eu"', env, rounds=5)
+
+
+if __name__ == '__main__':
+    unittest.main()
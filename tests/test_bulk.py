@@ -0,0 +1,37 @@
+# coding=utf-8
+# author=veficos
+
+import io
+import unittest
+
+from expr.ebulk import compile_rules, read_rules
+from expr.executor import Environment
+
+
+def compile_text(content):
+    return compile_rules(read_rules(io.StringIO(content)), workers=1)
+
+
+class BulkTest(unittest.TestCase):
+    def test_lines(self):
+        functions, errors = compile_text('# rules\na + 1\n\n  x $ y\n\tb >\na + 1\n')
+        self.assertEqual(sorted(functions), ['2', '6'])
+        env = Environment()
+        env.push_object('a', 1)
+        self.assertEqual(functions['6'](env), 2)
+        self.assertEqual([(x.name, x.line, x.column) for x in errors], [('4', 4, 5), ('5', 5, 5)])
+
+    def test_json(self):
+        functions, errors = compile_text('{"ok": "a + 1", "bad": "a &&\\n (b +", "number": 5}')
+        self.assertEqual(list(functions), ['ok'])
+        self.assertEqual([(x.name, x.line, x.column) for x in errors], [('bad', 2, 6), ('number', 1, 1)])
+
+    def test_failures_do_not_stop_the_pack(self):
+        # too deep for the artifact encoding the workers send back
+        functions, errors = compile_text('a' + ' + 1' * 3000 + '\na\n')
+        self.assertEqual(list(functions), ['2'])
+        self.assertEqual([x.name for x in errors], ['1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+# coding=utf-8
+# author=veficos
+
+import unittest
+
+from expr.east import *
+from expr.elexer import Lexer
+from expr.eparser import Parser
+from expr.ecache import ASTCache
+from expr.ecompiler import compile_ast
+from expr.eoptimizer import count_nodes, optimize
+from expr.executor import Environment, Executor
+
+
+def parse(text):
+    return Parser(Lexer(text)).parse()
+
+
+class CompilerTest(unittest.TestCase):
+    def setUp(self):
+        self.env = Environment()
+        self.env.push_object('a', 1)
+        self.env.push_object('b', 2)
+
+    def test_matches_tree_evaluation(self):
+        for text in ['a + b * 3', 'a if b > 1 else 0', 'a && b', '!a || b', '(a - b) % 3']:
+            ast = parse(text)
+            self.assertEqual(compile_ast(ast)(self.env), ast.eval(self.env), text)
+
+    def test_long_chain_falls_back_to_tree_evaluation(self):
+        text = 'a' + ' + a' * 250
+        self.assertEqual(compile_ast(parse(text))(self.env), 251)
+        self.assertEqual(Executor(text, self.env, cache=ASTCache()).exec(), 251)
+
+    def test_long_chain_with_bindings(self):
+        ast = parse('a' + ' + b' * 250)
+        self.assertEqual(compile_ast(ast, {'b': 10})(self.env), 2501)
+
+    def test_optimizer_handles_deep_trees(self):
+        ast = parse('a' + ' + 1' * 5000)
+        self.assertEqual(count_nodes(ast), 10001)
+        self.assertEqual(count_nodes(optimize(ast)), 10001)
+        self.assertEqual(repr(optimize(parse('1' + ' + 1' * 5000))), repr(IntegerConstant(5001)))
+        self.assertIsInstance(ASTCache().parse('!(' * 2000 + 'a' + ')' * 2000), Not)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+# coding=utf-8
+# author=veficos
+
+import unittest
+
+from expr.ecache import ASTCache
+from expr.elazy import LazyEnvironment
+from expr.executor import Executor
+
+
+class LazyEnvironmentTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = ASTCache()
+        self.env = LazyEnvironment()
+        self.loads = []
+
+    def loader(self, name, value):
+        def load():
+            self.loads.append(name)
+            return value
+        return load
+
+    def exec(self, text):
+        return Executor(text, self.env, cache=self.cache).exec()
+
+    def test_short_circuit_skips_loaders(self):
+        self.env.push_loader('cheap', self.loader('cheap', True))
+        self.env.push_loader('expensive', self.loader('expensive', {'x': 1}))
+        self.assertTrue(self.exec('cheap || expensive.x == 1'))
+        self.assertTrue(self.exec('expensive.x == 1 if !cheap else cheap'))
+        self.assertEqual(self.loads, ['cheap', 'cheap'])
+
+    def test_batch_loader_is_called_once(self):
+        batches = []
+
+        def load(names):
+            batches.append(sorted(names))
+            return {x: len(batches) for x in names}
+        self.env.push_batch_loader(['a', 'b'], load)
+        self.assertEqual(self.exec('a + b'), 2)
+        self.assertEqual(batches, [['a', 'b']])
+
+    def test_values_are_loaded_again_for_each_evaluation(self):
+        counter = []
+        self.env.push_loader('n', lambda: counter.append(1) or len(counter))
+        self.assertEqual(self.exec('n'), 1)
+        self.assertEqual(self.exec('n'), 2)
+        self.assertEqual(self.env.loaded, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+# coding=utf-8
+# author=veficos
+
+import decimal
+import unittest
+
+from expr.elexer import Lexer, LexerError, Token
+
+
+def tokens(text):
+    return list(Lexer(text))
+
+
+class LexerTest(unittest.TestCase):
+    def test_comparison_operators(self):
+        self.assertEqual(tokens('a > b'), [(Token.Identifier, 'a'), (Token.Gt, '>'), (Token.Identifier, 'b')])
+        self.assertEqual([x for x, _ in tokens('< <= > >= == != !')],
+                         [Token.Lt, Token.Leq, Token.Gt, Token.Geq, Token.Eq, Token.Neq, Token.Not])
+
+    def test_two_character_operators_before_prefixes(self):
+        self.assertEqual([x for x, _ in tokens('a>=b')], [Token.Identifier, Token.Geq, Token.Identifier])
+        self.assertEqual([x for x, _ in tokens('!a!=b')], [Token.Not, Token.Identifier, Token.Neq, Token.Identifier])
+        self.assertEqual([x for x, _ in tokens('a&&b||c')],
+                         [Token.Identifier, Token.And, Token.Identifier, Token.Or, Token.Identifier])
+
+    def test_keywords_are_whole_identifiers(self):
+        self.assertEqual(tokens('iffy elsewhere nilly trueish falsey'),
+                         [(Token.Identifier, x) for x in ['iffy', 'elsewhere', 'nilly', 'trueish', 'falsey']])
+        self.assertEqual([x for x, _ in tokens('if else nil true false')],
+                         [Token.If, Token.Else, Token.NilConstant, Token.TrueConstant, Token.FalseConstant])
+
+    def test_numbers(self):
+        self.assertEqual(tokens('0x1F 017 0 42 1.50'), [
+            (Token.IntegerConstant, 31),
+            (Token.IntegerConstant, 15),
+            (Token.IntegerConstant, 0),
+            (Token.IntegerConstant, 42),
+            (Token.DecimalConstant, decimal.Decimal('1.50')),
+        ])
+
+    def test_strings(self):
+        self.assertEqual(tokens('"a b" u8"c"'), [(Token.StringConstant, 'a b'), (Token.StringConstant, 'c')])
+
+    def test_peek_does_not_consume(self):
+        lexer = Lexer('a + b')
+        self.assertEqual(lexer.peek(), (Token.Identifier, 'a'))
+        self.assertEqual(lexer.next(), (Token.Identifier, 'a'))
+        self.assertEqual(lexer.next(), (Token.Add, '+'))
+        self.assertEqual(lexer.start, 2)
+
+    def test_location(self):
+        lexer = Lexer('a\n  bc')
+        self.assertEqual(lexer.location(0), (1, 1))
+        self.assertEqual(lexer.location(4), (2, 3))
+
+    def test_unknown_symbol(self):
+        with self.assertRaises(LexerError):
+            tokens('a $ b')
+
+
+if __name__ == '__main__':
+    unittest.main()
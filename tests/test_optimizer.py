@@ -0,0 +1,69 @@
+# coding=utf-8
+# author=veficos
+
+import unittest
+
+from expr.east import *
+from expr.elexer import Lexer
+from expr.eparser import Parser
+from expr.eoptimizer import specialize
+from expr.executor import Environment
+
+
+def parse(text):
+    return Parser(Lexer(text)).parse()
+
+
+class SpecializeTest(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.known = Environment()
+        self.known.push_object('config', {
+            'threshold': 10,
+            'tiers': [1, 2, 3],
+            'm': {True: {'x': 'vip'}, False: {'x': 'novip'}},
+        })
+        self.known.push_object('flags', {'beta': False})
+        self.known.push_pure('double', lambda x: x * 2)
+        self.known.push_object('log', lambda x: self.calls.append(x) or 0)
+
+    def full(self, **objects):
+        env = Environment()
+        env.objects.update(self.known.objects)
+        env.objects.update(objects)
+        return env
+
+    def assertResidual(self, text, expected, **objects):
+        ast = parse(text)
+        residual = specialize(ast, self.known)
+        self.assertEqual(repr(residual), expected, text)
+        env = self.full(**objects)
+        self.assertEqual(residual.eval(env), ast.eval(env), text)
+
+    def test_known_reads_become_constants(self):
+        self.assertResidual('x > config.threshold', '(GreaterThan: (Symbol: x)>(IntegerConstant: 10))', x=11)
+        self.assertResidual('config.tiers[2] * x', '(Multiply: (IntegerConstant: 3)*(Symbol: x))', x=2)
+
+    def test_constant_branches_are_pruned(self):
+        self.assertResidual('flags.beta && x > 1 || y', '(Symbol: y)', x=2, y=5)
+        self.assertResidual('x if flags.beta else y', '(Symbol: y)', x=1, y=2)
+
+    def test_pure_calls_on_known_arguments_are_folded(self):
+        self.assertResidual('double(config.threshold) + x', '(Add: (IntegerConstant: 20)+(Symbol: x))', x=1)
+
+    def test_unknown_index_inside_a_path_is_not_resolved(self):
+        user = {'vip': False, 'id': 7}
+        residual = specialize(parse('config.m[!user.vip].x'), self.known)
+        self.assertEqual(residual.eval(self.full(user=user)), 'vip')
+        residual = specialize(parse('config.m[log(user.id) == 0].x'), self.known)
+        self.assertEqual(self.calls, [])
+        self.assertEqual(residual.eval(self.full(user=user)), 'vip')
+        self.assertEqual(self.calls, [7])
+
+    def test_unknown_and_composite_values_stay(self):
+        self.assertResidual('config.tiers', "(Member: (Symbol: config).'tiers')")
+        self.assertResidual('other.a', "(Member: (Symbol: other).'a')", other={'a': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
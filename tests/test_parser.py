@@ -0,0 +1,165 @@
+# coding=utf-8
+# author=veficos
+
+import decimal
+import random
+import unittest
+
+from expr.east import *
+from expr.elexer import Lexer
+from expr.eparser import Parser, GrammarError
+
+
+def parse(text):
+    return Parser(Lexer(text)).parse()
+
+
+def a(name):
+    return Symbol(name)
+
+
+# binding power of each binary node, mirroring the table in eparser
+_power = {
+    LogicalOr: (1, '||'), LogicalAnd: (2, '&&'),
+    Equal: (3, '=='), UnEqual: (3, '!='),
+    LessThan: (4, '<'), LessOrEqual: (4, '<='), GreaterThan: (4, '>'), GreaterOrEqual: (4, '>='),
+    Add: (5, '+'), Subtract: (5, '-'),
+    Multiply: (6, '*'), Divide: (6, '/'), IntegerDivide: (6, '%'),
+}
+
+
+def _primary(node):
+    return isinstance(node, (Symbol, Constant, Member, Subscript, FunctionCall))
+
+
+def render(node, minimal):
+    """Source text for node; minimal drops every parenthesis precedence makes redundant."""
+    def group(child, needed):
+        text = render(child, minimal)
+        return '(%s)' % text if needed or not minimal else text
+
+    kind = type(node)
+    if kind is Symbol:
+        return str(node)
+    elif kind is IntegerConstant:
+        return str(node.eval(None))
+    elif kind is Member:
+        return '%s.%s' % (group(node.obj, not _primary(node.obj)), node.member)
+    elif kind is Subscript:
+        return '%s[%s]' % (group(node.obj, not _primary(node.obj)), render(node.subscript, minimal))
+    elif kind is FunctionCall:
+        return '%s(%s)' % (group(node.function, not _primary(node.function)),
+                           ', '.join(render(x, minimal) for x in node.args))
+    elif kind is Negative or kind is Not:
+        return '%s%s' % ('-' if kind is Negative else '!', group(node.value, not _primary(node.value)))
+    elif kind is If:
+        return '%s if %s else %s' % (group(node.yes, type(node.yes) is If),
+                                     group(node.condition, type(node.condition) is If),
+                                     group(node.no, False))
+    power, op = _power[kind]
+
+    def weaker(child, strict):
+        if type(child) is If:
+            return True
+        if type(child) not in _power:
+            return False
+        return _power[type(child)][0] < power if strict else _power[type(child)][0] <= power
+    return '%s %s %s' % (group(node.lhs, weaker(node.lhs, True)), op, group(node.rhs, weaker(node.rhs, False)))
+
+
+def generate(rng, depth):
+    if depth <= 0 or rng.random() < 0.2:
+        return a(rng.choice('abcxyz')) if rng.random() < 0.7 else IntegerConstant(rng.randrange(100))
+    choice = rng.random()
+    if choice < 0.5:
+        return rng.choice(list(_power))(generate(rng, depth - 1), generate(rng, depth - 1))
+    elif choice < 0.6:
+        return rng.choice([Negative, Not])(generate(rng, depth - 1))
+    elif choice < 0.7:
+        return If(generate(rng, depth - 1), generate(rng, depth - 1), generate(rng, depth - 1))
+    elif choice < 0.8:
+        return Member(generate(rng, depth - 1), rng.choice(['m', 'n']))
+    elif choice < 0.9:
+        return Subscript(generate(rng, depth - 1), generate(rng, depth - 1))
+    return FunctionCall(generate(rng, depth - 1), [generate(rng, depth - 1) for _ in range(rng.randrange(3))])
+
+
+class ParserTest(unittest.TestCase):
+    def assertTree(self, text, expected):
+        self.assertEqual(repr(parse(text)), repr(expected))
+
+    def test_precedence(self):
+        self.assertTree('1 + 2 * 3', Add(IntegerConstant(1), Multiply(IntegerConstant(2), IntegerConstant(3))))
+        self.assertTree('a || b && c', LogicalOr(a('a'), LogicalAnd(a('b'), a('c'))))
+        self.assertTree('a == b < c', Equal(a('a'), LessThan(a('b'), a('c'))))
+        self.assertTree('a && b == c', LogicalAnd(a('a'), Equal(a('b'), a('c'))))
+        self.assertTree('a < b + c', LessThan(a('a'), Add(a('b'), a('c'))))
+        self.assertTree('(a + b) * c', Multiply(Add(a('a'), a('b')), a('c')))
+
+    def test_left_associativity(self):
+        self.assertTree('a - b - c', Subtract(Subtract(a('a'), a('b')), a('c')))
+        self.assertTree('a % b / c', Divide(IntegerDivide(a('a'), a('b')), a('c')))
+        self.assertTree('a || b || c', LogicalOr(LogicalOr(a('a'), a('b')), a('c')))
+
+    def test_unary(self):
+        self.assertTree('-a * b', Multiply(Negative(a('a')), a('b')))
+        self.assertTree('!x == y', Equal(Not(a('x')), a('y')))
+        self.assertTree('-(-a)', Negative(Negative(a('a'))))
+        self.assertTree('+a', a('a'))
+
+    def test_postfix(self):
+        self.assertTree('-a.b[1](2)', Negative(FunctionCall(Subscript(Member(a('a'), 'b'), IntegerConstant(1)),
+                                                            [IntegerConstant(2)])))
+        self.assertTree('a[b][c].d', Member(Subscript(Subscript(a('a'), a('b')), a('c')), 'd'))
+        self.assertTree('f()(1, x)', FunctionCall(FunctionCall(a('f'), []), [IntegerConstant(1), a('x')]))
+        self.assertTree('!a.b', Not(Member(a('a'), 'b')))
+
+    def test_if_else(self):
+        self.assertTree('a if b else c', If(a('a'), a('b'), a('c')))
+        self.assertTree('a if b else c if d else e', If(a('a'), a('b'), If(a('c'), a('d'), a('e'))))
+        self.assertTree('(a if b else c) if d else e', If(If(a('a'), a('b'), a('c')), a('d'), a('e')))
+        self.assertTree('a if b if c else d else e', If(a('a'), If(a('b'), a('c'), a('d')), a('e')))
+        self.assertTree('a if b || c else d + 1', If(a('a'), LogicalOr(a('b'), a('c')), Add(a('d'), IntegerConstant(1))))
+
+    def test_constants(self):
+        self.assertTree('"s" == nil', Equal(StringConstant('s'), NilConstant(None)))
+        self.assertTree('true && false', LogicalAnd(BoolConstant(True), BoolConstant(False)))
+        self.assertEqual(parse('1.5').eval(None), decimal.Decimal('1.5'))
+
+    def test_error_positions(self):
+        cases = [
+            ('1 2', 2, 1, 3),
+            (')', 0, 1, 1),
+            ('a +\n  * b', 6, 2, 3),
+            ('f(a,', 4, 1, 5),
+            ('a[1', 3, 1, 4),
+            ('- -a', 2, 1, 3),
+        ]
+        for text, position, line, column in cases:
+            with self.assertRaises(GrammarError) as raised:
+                parse(text)
+            error = raised.exception
+            self.assertEqual((error.position, error.line, error.column), (position, line, column), text)
+
+    def test_trailing_input_is_rejected(self):
+        for text in ['a b', '(a))', 'f(1) 2', 'a if b else c d']:
+            with self.assertRaises(GrammarError):
+                parse(text)
+
+    def test_random_trees_round_trip(self):
+        # the same tree written with minimal and with full parentheses must parse back to it
+        rng = random.Random(20261018)
+        for _ in range(2000):
+            tree = generate(rng, 5)
+            for minimal in (True, False):
+                text = render(tree, minimal)
+                self.assertEqual(repr(parse(text)), repr(tree), text)
+
+    def test_deep_nesting(self):
+        text = '(' * 5000 + 'a' + ')' * 5000
+        self.assertEqual(repr(parse(text)), repr(a('a')))
+        self.assertIsInstance(parse('1' + ' + 1' * 5000), Add)
+
+
+if __name__ == '__main__':
+    unittest.main()
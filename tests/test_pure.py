@@ -0,0 +1,59 @@
+# coding=utf-8
+# author=veficos
+
+import unittest
+
+from expr.elexer import Lexer
+from expr.eparser import Parser
+from expr.ecache import ASTCache
+from expr.ecompiler import compile_ast
+from expr.eflat import flatten
+from expr.epure import PureFunction
+from expr.erules import RuleSet
+from expr.evm import assemble
+from expr.executor import Environment, Executor
+
+
+def parse(text):
+    return Parser(Lexer(text)).parse()
+
+
+class PureFunctionTest(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.env = Environment()
+        self.env.push_pure('geo', lambda x: self.calls.append(x) or x * 2, scope=PureFunction.Evaluation)
+        self.env.push_object('u', 3)
+
+    def test_evaluation_scope_is_shared_within_one_run_only(self):
+        executor = Executor('geo(u) + geo(u)', self.env, cache=ASTCache())
+        self.assertEqual(executor.exec(), 12)
+        self.assertEqual(executor.exec(), 12)
+        self.assertEqual(self.calls, [3, 3])
+
+    def test_every_evaluator_uses_the_memo(self):
+        ast = parse('geo(u) + geo(u)')
+        evaluators = [ast.eval, compile_ast(ast), assemble(ast).run, flatten(ast).eval]
+        for evaluate in evaluators:
+            del self.calls[:]
+            self.env.clear_memo()
+            self.assertEqual(evaluate(self.env), 12)
+            self.assertEqual(self.calls, [3], evaluate)
+
+        # shared subexpressions are computed once per run anyway, so check
+        # that a second run inside the same evaluation hits the memo
+        rules = RuleSet({'r': 'geo(u) + geo(u)'}, cache=ASTCache())
+        del self.calls[:]
+        self.env.clear_memo()
+        self.assertEqual(rules.eval(self.env), {'r': 12})
+        self.assertEqual(rules.eval(self.env), {'r': 12})
+        self.assertEqual(self.calls, [3])
+
+    def test_memo_is_typed(self):
+        self.env.push_pure('t', lambda x: type(x).__name__)
+        self.assertEqual([Executor(x, self.env).exec() for x in ['t(true)', 't(1.0)', 't(1)']],
+                         ['bool', 'Decimal', 'int'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+# coding=utf-8
+# author=veficos
+
+import unittest
+
+from expr.ecache import ASTCache
+from expr.escope import Scope, ScopeError
+
+
+class ScopeTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = ASTCache()
+        self.base = Scope({'rate': 2, 'limit': 10}).freeze()
+
+    def test_children_shadow_base_names(self):
+        function = self.base.compile('rate * x', cache=self.cache)
+        self.assertEqual(function(self.base.child({'x': 3})), 6)
+        self.assertEqual(function(self.base.child({'x': 3, 'rate': 5})), 15)
+
+    def test_fixed_names_are_baked(self):
+        function = self.base.compile('rate * x', fixed=['rate'], cache=self.cache)
+        self.assertEqual(function(self.base.child({'x': 3, 'rate': 5})), 6)
+
+    def test_fixed_names_must_be_frozen(self):
+        with self.assertRaises(ScopeError):
+            self.base.compile('x', fixed=['x'], cache=self.cache)
+
+    def test_frozen_scope_is_read_only(self):
+        with self.assertRaises(ScopeError):
+            self.base.push_object('rate', 3)
+        with self.assertRaises(ScopeError):
+            Scope().child()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+# coding=utf-8
+# author=veficos
+
+import unittest
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from expr.elexer import Lexer
+from expr.eparser import Parser
+from expr.executor import Environment
+
+
+def parse(text):
+    return Parser(Lexer(text)).parse()
+
+
+class _Row(object):
+    def __init__(self, env, index):
+        self.env = env
+        self.index = index
+
+    def get_object(self, name):
+        value = self.env.get_object(name)
+        return value[self.index] if isinstance(value, np.ndarray) else value
+
+
+@unittest.skipUnless(np is not None, 'numpy is not installed')
+class VectorEvaluatorTest(unittest.TestCase):
+    def setUp(self):
+        from expr.evector import VectorEvaluator
+        self.VectorEvaluator = VectorEvaluator
+        self.calls = []
+        self.env = Environment()
+        self.env.push_object('x', np.array([0, 1, 2, 0, 4]))
+        self.env.push_object('s', np.array(['a', 'b', 'c', 'd', 'e'], dtype=object))
+        self.env.push_object('f', lambda v: self.calls.append(v) or 10 // v)
+        self.env.push_object('day', lambda v: np.datetime64('2026-01-01') + int(v))
+
+    def rows(self, text):
+        ast = parse(text)
+        return [ast.eval(_Row(self.env, i)) for i in range(5)]
+
+    def assertRows(self, text):
+        del self.calls[:]
+        result = self.VectorEvaluator(parse(text)).eval(self.env)
+        calls = list(self.calls)
+        self.assertEqual(list(result), self.rows(text), text)
+        return calls
+
+    def test_short_circuit_fallback_skips_rows(self):
+        self.assertEqual(self.assertRows('x != 0 && f(x) > 2'), [1, 2, 4])
+        self.assertEqual(self.assertRows('x == 0 || f(x) > 3'), [1, 2, 4])
+        self.assertEqual(self.assertRows('f(x) if x > 0 else 0'), [1, 2, 4])
+
+    def test_unselected_rows_keep_their_own_value(self):
+        # bool and datetime64 columns cannot be merged, so the && falls back
+        # to rows; rows where the lhs is false must keep their own value
+        self.assertRows('x != 0 && day(x)')
+        self.assertRows('x == 0 || day(x)')
+
+    def test_vector_arithmetic(self):
+        self.assertRows('x * 2 + 1 > 3')
+        self.assertRows('!(x > 1)')
+
+
+if __name__ == '__main__':
+    unittest.main()